@@ -1,56 +1,111 @@
 """Base agent implementation with conversation memory and tool integration."""
-from typing import Dict, List, Optional, Any, Callable, TypeVar, Generic
-from pydantic import BaseModel, Field
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Any, Callable, Tuple, TypeVar, Generic
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+import inspect
 import json
 
 T = TypeVar('T', bound=BaseModel)
 
 class Tool(BaseModel):
     """A tool that can be called by the agent."""
+    model_config = ConfigDict(frozen=True)
+
     name: str
     description: str
     parameters: dict
     function: Callable[..., Any]
+    _is_coroutine: bool = PrivateAttr(default=False)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Resolve how the function is dispatched once, at registration time."""
+        function = self.function
+        self._is_coroutine = (
+            inspect.iscoroutinefunction(function)
+            # Callable objects with an async __call__
+            or inspect.iscoroutinefunction(getattr(function, "__call__", None))
+        )
 
     def to_dict(self) -> dict:
-        """Convert tool to a dictionary for the LLM."""
+        """Convert tool to a dictionary for the LLM.
+        
+        Parameter keys are sorted so the schema serializes identically every time.
+        """
         return {
             "name": self.name,
             "description": self.description,
-            "parameters": self.parameters
+            "parameters": json.loads(json.dumps(self.parameters, sort_keys=True))
         }
 
 
 class Message(BaseModel):
     """A message in the conversation."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     role: str  # 'user', 'assistant', 'system', or 'tool'
     content: str
     name: Optional[str] = None
     tool_call_id: Optional[str] = None
 
+    def as_dict(self) -> Dict[str, Any]:
+        """Convert message to a dictionary for the LLM, omitting unset fields.
+        
+        Equivalent to model_dump(exclude_none=True) for this fixed schema.
+        """
+        data = {"role": self.role, "content": self.content}
+        if self.name is not None:
+            data["name"] = self.name
+        if self.tool_call_id is not None:
+            data["tool_call_id"] = self.tool_call_id
+        return data
+
 
 class ConversationMemory:
     """Manages conversation history and context."""
     
     def __init__(self, max_messages: int = 20):
         """Initialize with a maximum number of messages to retain."""
-        self.messages: List[Message] = []
+        # Oldest messages are evicted automatically once the limit is reached
+        self.messages: Deque[Message] = deque(maxlen=max_messages)
+        # Committed messages never change, so each one is serialized only once
+        self._dumped: Deque[Dict[str, Any]] = deque(maxlen=max_messages)
         self.max_messages = max_messages
+        # Pinned messages sent ahead of the history and never evicted
+        self.prefix: Tuple[Message, ...] = ()
+        self._prefix_dumped: List[Dict[str, Any]] = []
+    
+    def set_prefix(self, messages: Iterable[Message]) -> None:
+        """Pin messages (system prompt, examples) ahead of the history.
+        
+        The prefix does not count towards max_messages and survives clear(),
+        so every request starts with the same messages.
+        """
+        self.prefix = tuple(messages)
+        self._prefix_dumped = [message.as_dict() for message in self.prefix]
     
     def add_message(self, message: Message) -> None:
         """Add a message to the conversation history."""
         self.messages.append(message)
-        # Trim old messages if we're over the limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages:]
+        self._dumped.append(message.as_dict())
     
     def get_messages(self) -> List[Dict[str, Any]]:
-        """Get all messages in a format suitable for the LLM."""
-        return [msg.model_dump(exclude_none=True) for msg in self.messages]
+        """Get all messages in a format suitable for the LLM.
+        
+        The returned dicts are shared with the memory and must not be mutated.
+        """
+        return [*self._prefix_dumped, *self._dumped]
+    
+    def get_prefix_messages(self) -> List[Dict[str, Any]]:
+        """Get the pinned prefix in a format suitable for the LLM.
+        
+        The returned dicts are shared with the memory and must not be mutated.
+        """
+        return list(self._prefix_dumped)
     
     def clear(self) -> None:
-        """Clear the conversation history."""
-        self.messages = []
+        """Clear the conversation history, keeping the pinned prefix."""
+        self.messages.clear()
+        self._dumped.clear()
 
 
 class BaseAgent(Generic[T]):
@@ -68,24 +123,29 @@ class BaseAgent(Generic[T]):
         Args:
             system_prompt: The system prompt to guide the agent's behavior
             tools: List of tools the agent can use
-            max_memory: Maximum number of messages to retain in memory
+            max_memory: Maximum number of dialogue messages to retain in memory,
+                not counting the pinned system prompt
         """
         self.system_prompt = system_prompt
         self.memory = ConversationMemory(max_messages=max_memory)
         self.tools = {tool.name: tool for tool in (tools or [])}
+        # Tool schemas never change once registered, so serialize them once
+        self._tools_payload: List[dict] = [tool.to_dict() for tool in self.tools.values()]
         self._initialize_conversation()
     
     def _initialize_conversation(self) -> None:
         """Initialize the conversation with the system prompt."""
         self.memory.clear()
-        self.memory.add_message(Message(
-            role="system",
-            content=self.system_prompt
-        ))
+        self.memory.set_prefix(self._prefix_messages())
+    
+    def _prefix_messages(self) -> Tuple[Message, ...]:
+        """Messages pinned at the start of every conversation."""
+        return (Message(role="system", content=self.system_prompt),)
     
     def add_tool(self, tool: Tool) -> None:
         """Add a tool to the agent's toolkit."""
         self.tools[tool.name] = tool
+        self._tools_payload = [t.to_dict() for t in self.tools.values()]
     
     async def process_message(
         self,
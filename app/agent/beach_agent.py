@@ -1,15 +1,47 @@
 """Beach information agent implementation."""
-from typing import List, Dict, Any, Optional, Union
-import json
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
+import asyncio
+import contextlib
 import logging
-from datetime import datetime
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import orjson
+from pydantic import BaseModel, ConfigDict
 
 from app.agent.base import BaseAgent, Tool, Message
 from app.config import get_settings
 from app.utils.llm import llm_client
+from app.utils.response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Get settings
+settings = get_settings()
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result to a JSON string using orjson."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+_loads = orjson.loads
+
+_NO_RESPONSE = "I don't have a response for that."
+_ERROR_RESPONSE = "I'm sorry, I encountered an error while processing your request. Please try again later."
+
+
+def _extract_text(response: Any) -> str:
+    """Pull the assistant text out of an LLM response or plain string."""
+    # _get_llm_response already unwraps plain answers, so strings are the common case
+    if isinstance(response, str):
+        return response or _NO_RESPONSE
+    try:
+        return response.choices[0].message.content or _NO_RESPONSE
+    except (AttributeError, IndexError, TypeError):
+        return _NO_RESPONSE
+
 FEW_SHOT_EXAMPLES = [
     {"role": "user", "content": "What is the tide at Santa Monica Beach today?"},
     {"role": "assistant", "content": "According to NOAA, the next high tide at Santa Monica Beach is at 2:30 PM, and the next low tide is at 8:45 AM. Always check local signage for safety updates."},
@@ -25,6 +57,9 @@ FEW_SHOT_EXAMPLES = [
     {"role": "assistant", "content": "Yes, you can bring personal umbrellas to South Beach, but large tents and cabanas are not permitted. Please ensure your umbrella is securely anchored and does not obstruct pathways."},
 ]
 
+# Built once and pinned ahead of every conversation so the prompt prefix is stable
+_FEW_SHOT_MESSAGES = tuple(Message(**example) for example in FEW_SHOT_EXAMPLES)
+
 
 DEFAULT_SYSTEM_PROMPT = """
 You are BeachBot, an expert AI assistant specializing in beach information for the USA.
@@ -52,6 +87,150 @@ Assistant: Yes, you can bring personal umbrellas to South Beach, but large tents
 
 from app.services.noaa_nws_client import NoaaNwsClient
 
+# Simple NOAA station mapping for demo; expand as needed
+NOAA_STATION_MAP = {
+    "santa monica": "9410840",
+    "venice": "9411340",
+    "fort lauderdale": "8722956",
+    "miami": "8723214",
+    "deerfield": "8722670",
+    "hollywood": "8723214",   # Hollywood Beach, FL
+    # Add more mappings as needed
+}
+
+# For demo: use a static lat/lon for known beaches
+BEACH_COORDS = {
+    "Pompano Beach": (26.2379, -80.1248),
+    "Hollywood Beach": (26.0112, -80.1152),
+    "Miami Beach": (25.7907, -80.1300),
+    "Santa Monica Beach": (34.0100, -118.4962),
+    "Venice Beach": (33.9850, -118.4695),
+}
+
+
+class BeachInfo(BaseModel):
+    """Static data known for a beach."""
+    model_config = ConfigDict(frozen=True)
+
+    station_id: Optional[str] = None
+    coords: Optional[Tuple[float, float]] = None
+
+
+def _beach_key(name: str) -> str:
+    """Canonical lookup key for a beach name, e.g. "Santa Monica Beach" -> "santa monica"."""
+    return name.strip().lower().removesuffix("beach").strip()
+
+
+def _build_beaches() -> Dict[str, BeachInfo]:
+    """Merge the station and coordinate tables under canonical keys."""
+    keys = {_beach_key(name) for name in (*NOAA_STATION_MAP, *BEACH_COORDS)}
+    stations = {_beach_key(name): station for name, station in NOAA_STATION_MAP.items()}
+    coords = {_beach_key(name): latlon for name, latlon in BEACH_COORDS.items()}
+    return {
+        key: BeachInfo(station_id=stations.get(key), coords=coords.get(key))
+        for key in keys
+    }
+
+
+_BEACHES = _build_beaches()
+
+
+def _compile_known_beach_re() -> "re.Pattern[str]":
+    """Build one case-insensitive matcher over every beach we have data for."""
+    # Longest names first so "santa monica" wins over any shorter overlap
+    alternation = "|".join(re.escape(name) for name in sorted(_BEACHES, key=len, reverse=True))
+    return re.compile(rf"\b({alternation})(?:\s+beach)?\b", re.IGNORECASE)
+
+
+_KNOWN_BEACH_RE = _compile_known_beach_re()
+# Intent keywords, including the inflections the old substring checks caught
+_TIDE_KW = frozenset({"tide", "tides", "tidal", "riptide", "riptides"})
+_AMENITY_KW = frozenset({
+    "amenities", "amenity", "restaurant", "restaurants", "hotel", "hotels", "parking",
+})
+_WEATHER_KW = frozenset({
+    "weather", "forecast", "forecasts", "temperature", "temperatures", "conditions",
+    "wind", "winds", "windy", "windsurf", "windsurfing", "windsurfer", "windsurfers",
+    "rain", "rainy", "raining", "rainfall", "cloud", "clouds", "cloudy",
+    "sunny", "humid", "humidity", "storm", "storms", "stormy", "thunderstorm", "thunderstorms",
+})
+_TERMINAL_CHARS = frozenset(".!?\"')]}")
+_TOKEN_RE = re.compile(r'[a-z]+')
+_ASSISTANT_RE = re.compile(r'### Assistant:\n(.+?)(?:\n###|$)', re.DOTALL)
+_LOC_RE = re.compile(r'(?:at|in|near)\s+([a-z\s]+beach)', re.IGNORECASE)
+_BEACH_RE = re.compile(r'([a-z\s]+beach)', re.IGNORECASE)
+_WORD_RE = re.compile(r'\b\w+\b')
+
+
+@lru_cache(maxsize=2)
+def _tide_date_range(ordinal: int) -> Tuple[str, str]:
+    """NOAA begin/end date strings for the given day and the next, formatted once per day."""
+    day = date.fromordinal(ordinal)
+    return day.strftime('%Y%m%d'), (day + timedelta(days=1)).strftime('%Y%m%d')
+
+
+def _format_tide(prediction: Any) -> str:
+    """Format a NOAA tide prediction as e.g. "H at 02:30 PM (5.1 ft)"."""
+    try:
+        when = datetime.fromisoformat(prediction.t).strftime('%I:%M %p')
+    except ValueError:
+        when = prediction.t
+    return f"{prediction.type} at {when} ({prediction.v} ft)"
+
+
+@lru_cache(maxsize=1)
+def _get_nlp():
+    """Load the spaCy pipeline once, keeping only what NER needs.
+    
+    Returns None when spaCy or its model is unavailable, in which case beach
+    extraction falls back to regular expressions.
+    """
+    try:
+        import spacy
+        return spacy.load(
+            "en_core_web_sm",
+            disable=["tagger", "parser", "lemmatizer", "attribute_ruler"]
+        )
+    except (ImportError, OSError) as e:
+        logger.warning(f"spaCy pipeline unavailable, using regex beach extraction: {str(e)}")
+        return None
+
+
+def _normalize_beach(name: str) -> str:
+    """Title-case a place name and make sure it ends with "Beach"."""
+    name = name.strip().title()
+    if not name.lower().endswith("beach"):
+        name += " Beach"
+    return name
+
+
+def _extract_beach_name(message: str) -> Optional[str]:
+    """Robust location extraction from a user message."""
+    # Known beaches resolve with a single precompiled scan, no NER needed
+    known = _KNOWN_BEACH_RE.search(message)
+    if known:
+        return known.group(1).title() + " Beach"
+    nlp = _get_nlp()
+    if nlp is not None:
+        doc = nlp(message)
+        # Look for the first GPE, LOC, or FAC entity
+        for ent in doc.ents:
+            if ent.label_ in ("GPE", "LOC", "FAC"):
+                return _normalize_beach(ent.text)
+    # Fallback to previous regex-based extraction
+    msg = message.strip()
+    loc_match = _LOC_RE.search(msg)
+    if loc_match:
+        return _normalize_beach(loc_match.group(1))
+    matches = _BEACH_RE.findall(msg)
+    if matches:
+        return _normalize_beach(matches[-1])
+    words = _WORD_RE.findall(msg)
+    if words:
+        return words[-1].title()
+    return None
+
+
 class BeachAgent(BaseAgent):
     """Agent specialized in providing beach information."""
 
@@ -61,66 +240,72 @@ class BeachAgent(BaseAgent):
         - If the LLM returns a multi-turn transcript, extract only the first assistant answer.
         - Trims whitespace, ensures proper punctuation.
         """
-        import re
         if not response:
             return "I'm sorry, I couldn't find the information you requested."
         # Extract only the first assistant answer if present
-        match = re.search(r'### Assistant:\n(.+?)(?:\n###|$)', response, re.DOTALL)
+        match = _ASSISTANT_RE.search(response)
         if match:
             response = match.group(1).strip()
         else:
             response = response.strip()
-        # Ensure first letter is capitalized
-        if response and not response[0].isupper():
+        if not response:
+            return response
+        # Ensure first letter is capitalized; only lowercase starts need a copy
+        if response[0].islower():
             response = response[0].upper() + response[1:]
-        # Ensure ends with punctuation
-        if response and response[-1] not in ".!?":
+        # Ensure ends with punctuation, allowing for closing quotes and brackets
+        if response[-1] not in _TERMINAL_CHARS:
             response += "."
         return response
 
-    # Simple mapping for demo; expand as needed
-    NOAA_STATION_MAP = {
-        "santa monica": "9410840",
-        "venice": "9411340",
-        "fort lauderdale": "8722956",
-        "miami": "8723214",
-        "deerfield": "8722670",
-        "hollywood": "8723214",   # Hollywood Beach, FL
-        # Add more mappings as needed
-    }
-
     async def _get_live_tide_info(self, beach: str) -> str:
         """
         Given a beach name, find the NOAA station and return formatted tide info.
         """
-        station_id = self.NOAA_STATION_MAP.get(beach.lower())
+        info = _BEACHES.get(_beach_key(beach))
+        station_id = info.station_id if info else None
         if not station_id:
-            return f"Sorry, I couldn't find tide data for {beach} Beach (no NOAA station mapping)."
-        from datetime import datetime, timedelta
-        today = datetime.utcnow()
-        tomorrow = today + timedelta(days=1)
+            return f"Sorry, I couldn't find tide data for {beach} (no NOAA station mapping)."
+        # Get high/low tide predictions for today
+        begin_date, end_date = _tide_date_range(datetime.utcnow().toordinal())
         try:
-            # Get high/low tide predictions for today
             predictions = await self.noaa_client.get_tide_predictions(
                 station_id=station_id,
-                begin_date=today.strftime('%Y%m%d'),
-                end_date=tomorrow.strftime('%Y%m%d'),
+                begin_date=begin_date,
+                end_date=end_date,
                 interval="hilo",
                 units="english",
                 time_zone="lst_ldt",
             )
             if not predictions:
-                return f"No tide predictions available for {beach} Beach (NOAA)."
-            # Format the next high and low tides
-            highs = [p for p in predictions if p.type == 'H']
-            lows = [p for p in predictions if p.type == 'L']
-            def fmt(p):
-                return f"{p.type} at {p.time.strftime('%I:%M %p')} ({p.value} ft)"
-            high_str = fmt(highs[0]) if highs else "N/A"
-            low_str = fmt(lows[0]) if lows else "N/A"
-            return f"According to NOAA, the next high tide at {beach} Beach is {high_str}, and the next low tide is {low_str}. (source: NOAA Tides & Currents)"
+                return f"No tide predictions available for {beach} (NOAA)."
+            # Find the next high and low tides in a single pass
+            high = low = None
+            for p in predictions:
+                if high is None and p.type == 'H':
+                    high = p
+                elif low is None and p.type == 'L':
+                    low = p
+                if high is not None and low is not None:
+                    break
+            high_str = _format_tide(high) if high else "N/A"
+            low_str = _format_tide(low) if low else "N/A"
+            return f"According to NOAA, the next high tide at {beach} is {high_str}, and the next low tide is {low_str}. (source: NOAA Tides & Currents)"
         except Exception as e:
-            return f"Sorry, there was an error fetching tide data for {beach} Beach: {str(e)}"
+            return f"Sorry, there was an error fetching tide data for {beach}: {str(e)}"
+
+    async def _get_amenities_info(self, beach: str) -> str:
+        """
+        Given a beach name, search Google Places and return formatted amenities info.
+        """
+        query = f"{beach} amenities"
+        places = await self.google_places_client.search_places(query=query)
+        results = places.results if hasattr(places, 'results') else []
+        logger.debug("Google Places results: %s", results)
+        if results:
+            amenities = ', '.join([r.name for r in results[:5]])
+            return f"According to Google Places, some amenities near {beach} include: {amenities} (source: Google Places API)"
+        return f"No amenities found for {beach} on Google Places."
 
     def __init__(
         self,
@@ -129,7 +314,8 @@ class BeachAgent(BaseAgent):
         noaa_nws_client=None,
         system_prompt: str = DEFAULT_SYSTEM_PROMPT,
         tools: Optional[List[Tool]] = None,
-        max_memory: int = 20,
+        max_memory: int = 8,
+        response_cache: Optional[ResponseCache] = None,
         **kwargs
     ):
         super().__init__(
@@ -138,188 +324,285 @@ class BeachAgent(BaseAgent):
             max_memory=max_memory,
             **kwargs
         )
-        self.settings = get_settings()
+        # Bound bursts against the LLM backend and tool endpoints
+        self._llm_sem = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self._tool_sem = asyncio.Semaphore(settings.TOOL_MAX_CONCURRENCY)
+        self.response_cache = response_cache
+        if self.response_cache is None and settings.RESPONSE_CACHE_SIZE > 0:
+            # No embedder is wired in, so only exact (normalized) repeats hit
+            self.response_cache = ResponseCache(max_entries=settings.RESPONSE_CACHE_SIZE)
         self.google_places_client = google_places_client
         self.noaa_client = noaa_client
         self.noaa_nws_client = noaa_nws_client
-        for example in FEW_SHOT_EXAMPLES:
-            self.memory.add_message(Message(
-                role=example["role"],
-                content=example["content"]
-            ))
 
 
     
+    def _prefix_messages(self) -> Tuple[Message, ...]:
+        """Pin the few-shot examples after the system prompt."""
+        return (*super()._prefix_messages(), *_FEW_SHOT_MESSAGES)
+
+    async def _answer_from_sources(self, message: str) -> Optional[str]:
+        """Answer the message from live data sources (NOAA, NWS, Google Places).
+        
+        Returns:
+            The response text, or None when the message should go to the LLM
+        """
+        beach = _extract_beach_name(message)
+        tokens = set(_TOKEN_RE.findall(message.lower()))
+        wants_tide = not tokens.isdisjoint(_TIDE_KW)
+        wants_amenities = not tokens.isdisjoint(_AMENITY_KW)
+        wants_weather = not tokens.isdisjoint(_WEATHER_KW)
+
+        if beach and wants_weather and self.noaa_nws_client:
+            info = _BEACHES.get(_beach_key(beach))
+            coords = info.coords if info else None
+            if coords:
+                weather_data, forecast_data = await asyncio.gather(
+                    self.noaa_nws_client.get_current_conditions(*coords),
+                    self.noaa_nws_client.get_forecast_summary(
+                        *coords, fields=("detailedForecast",)
+                    ),
+                )
+                weather_str = ""
+                if weather_data and "properties" in weather_data:
+                    props = weather_data["properties"]
+                    desc = props.get("textDescription", "No description")
+                    temp = props.get("temperature", {}).get("value")
+                    temp_unit = props.get("temperature", {}).get("unitCode", "").replace("unit:degC", "°C").replace("unit:degF", "°F")
+                    wind = props.get("windSpeed", {}).get("value")
+                    wind_unit = props.get("windSpeed", {}).get("unitCode", "")
+                    weather_str += f"Current weather at {beach}: {desc}, "
+                    if temp is not None:
+                        weather_str += f"Temperature: {temp}{temp_unit}, "
+                    if wind is not None:
+                        weather_str += f"Wind: {wind}{wind_unit}. "
+                if forecast_data and forecast_data["periods"]:
+                    today = forecast_data["periods"][0]
+                    if "detailedForecast" in today:
+                        weather_str += f"Forecast: {today['detailedForecast']}"
+                if not weather_str:
+                    weather_str = f"Sorry, no weather data found for {beach} (source: NOAA NWS)."
+                else:
+                    weather_str += " (source: NOAA National Weather Service)"
+                return weather_str
+            else:
+                response_text = f"Sorry, I couldn't determine the coordinates for {beach} to get weather information."
+                return response_text
+
+        if beach and (wants_tide or wants_amenities):
+            logger.debug("Extracted beach: %s", beach)
+            # Fetch each requested source concurrently; one failing must not sink the other
+            titles = []
+            fetches = []
+            if wants_tide and self.noaa_client:
+                logger.debug("Calling NOAA for tides for %s", beach)
+                titles.append("Tide Information")
+                fetches.append(self._get_live_tide_info(beach))
+            if wants_amenities and self.google_places_client:
+                logger.debug("Calling Google Places for amenities for %s", beach)
+                titles.append("Amenities")
+                fetches.append(self._get_amenities_info(beach))
+            results = await asyncio.gather(*fetches, return_exceptions=True)
+            sections = []
+            for title, info in zip(titles, results):
+                if isinstance(info, Exception):
+                    logger.error(f"Error fetching {title.lower()} for {beach}: {str(info)}", exc_info=info)
+                    info = f"Sorry, there was an error fetching {title.lower()} for {beach}: {str(info)}"
+                logger.debug("%s: %s", title, info)
+                sections.append(f"**{title}:**\n{info}")
+            response_text = "\n\n".join(sections)
+            logger.debug("Combined response: %s", response_text)
+            return response_text
+        elif self.noaa_client and wants_tide:
+            if beach:
+                tide_info = await self._get_live_tide_info(beach)
+                response_text = tide_info
+            else:
+                response_text = "Sorry, I couldn't determine which beach you're asking about for tide information."
+            return response_text
+        elif self.google_places_client and wants_amenities:
+            if beach:
+                response_text = await self._get_amenities_info(beach)
+            else:
+                response_text = "Sorry, I couldn't determine which beach you're asking about for amenities."
+            return response_text
+        return None
+    
     async def process_message(
         self,
         message: str,
         **kwargs
     ) -> str:
         """Process a user message and return the agent's response."""
-        self.memory.add_message(Message(
+        add_message = self.memory.add_message
+        add_message(Message(
             role="user",
             content=message
         ))
         try:
-            # Robust location extraction
-            def extract_beach_name(message: str) -> Optional[str]:
-                import spacy
-                import re
-                nlp = spacy.load("en_core_web_sm")
-                doc = nlp(message)
-                # Look for the first GPE, LOC, or FAC entity
-                for ent in doc.ents:
-                    if ent.label_ in ("GPE", "LOC", "FAC"):
-                        name = ent.text.strip().title()
-                        if not name.lower().endswith("beach"):
-                            name += " Beach"
-                        return name
-                # Fallback to previous regex-based extraction
-                msg = message.strip()
-                loc_match = re.search(r'(?:at|in|near)\s+([a-z\s]+beach)', msg, flags=re.IGNORECASE)
-                if loc_match:
-                    name = loc_match.group(1).strip().title()
-                    if not name.lower().endswith("beach"):
-                        name += " Beach"
-                    return name
-                matches = re.findall(r'([a-z\s]+beach)', msg, flags=re.IGNORECASE)
-                if matches:
-                    name = matches[-1].strip().title()
-                    if not name.lower().endswith("beach"):
-                        name += " Beach"
-                    return name
-                words = re.findall(r'\b\w+\b', msg)
-                if words:
-                    return words[-1].title()
-                return None
-            beach = extract_beach_name(message)
-            wants_tide = any(k in message.lower() for k in ["tide", "high tide", "low tide"])
-            wants_amenities = any(k in message.lower() for k in ["amenities", "restaurant", "hotel", "parking"])
-            wants_weather = any(k in message.lower() for k in ["weather", "forecast", "temperature", "conditions", "wind", "rain", "cloud", "sunny", "humid", "storm"])
-
-            if beach and wants_weather and self.noaa_nws_client:
-                # For demo: use a static lat/lon for known beaches, fallback to None
-                beach_coords = {
-                    "Pompano Beach": (26.2379, -80.1248),
-                    "Hollywood Beach": (26.0112, -80.1152),
-                    "Miami Beach": (25.7907, -80.1300),
-                    "Santa Monica Beach": (34.0100, -118.4962),
-                    "Venice Beach": (33.9850, -118.4695),
-                }
-                coords = beach_coords.get(beach)
-                if coords:
-                    weather_data = await self.noaa_nws_client.get_current_conditions(*coords)
-                    forecast_data = await self.noaa_nws_client.get_forecast(*coords)
-                    weather_str = ""
-                    if weather_data and "properties" in weather_data:
-                        props = weather_data["properties"]
-                        desc = props.get("textDescription", "No description")
-                        temp = props.get("temperature", {}).get("value")
-                        temp_unit = props.get("temperature", {}).get("unitCode", "").replace("unit:degC", "°C").replace("unit:degF", "°F")
-                        wind = props.get("windSpeed", {}).get("value")
-                        wind_unit = props.get("windSpeed", {}).get("unitCode", "")
-                        weather_str += f"Current weather at {beach}: {desc}, "
-                        if temp is not None:
-                            weather_str += f"Temperature: {temp}{temp_unit}, "
-                        if wind is not None:
-                            weather_str += f"Wind: {wind}{wind_unit}. "
-                    if forecast_data and "properties" in forecast_data:
-                        periods = forecast_data["properties"].get("periods", [])
-                        if periods:
-                            today = periods[0]
-                            weather_str += f"Forecast: {today['detailedForecast']}"
-                    if not weather_str:
-                        weather_str = f"Sorry, no weather data found for {beach} (source: NOAA NWS)."
-                    else:
-                        weather_str += " (source: NOAA National Weather Service)"
-                    self.memory.add_message(Message(role="assistant", content=weather_str))
-                    return self.format_response(weather_str)
-                else:
-                    response_text = f"Sorry, I couldn't determine the coordinates for {beach} to get weather information."
-                    self.memory.add_message(Message(role="assistant", content=response_text))
-                    return self.format_response(response_text)
-
-            if beach and (wants_tide or wants_amenities):
-                logger.debug(f"Extracted beach: {beach}")
-                sections = []
-                if wants_tide and self.noaa_client:
-                    logger.debug(f"Calling NOAA for tides for {beach}")
-                    tide_info = await self._get_live_tide_info(beach)
-                    logger.debug(f"NOAA tide info: {tide_info}")
-                    sections.append(f"**Tide Information:**\n{tide_info}")
-                if wants_amenities and self.google_places_client:
-                    logger.debug(f"Calling Google Places for amenities for {beach}")
-                    places = await self.google_places_client.search_places(query=f"{beach} beach amenities")
-                    results = places.results if hasattr(places, 'results') else []
-                    logger.debug(f"Google Places results: {results}")
-                    if results:
-                        amenities = ', '.join([r.name for r in results[:5]])
-                        amenities_info = f"According to Google Places, some amenities near {beach} Beach include: {amenities} (source: Google Places API)"
-                    else:
-                        amenities_info = f"No amenities found for {beach} Beach on Google Places."
-                    sections.append(f"**Amenities:**\n{amenities_info}")
-                response_text = "\n\n".join(sections)
-                logger.debug(f"Combined response: {response_text}")
-                self.memory.add_message(Message(role="assistant", content=response_text))
-                return self.format_response(response_text)
-            elif self.noaa_client and wants_tide:
-                if beach:
-                    tide_info = await self._get_live_tide_info(beach)
-                    response_text = tide_info
-                else:
-                    response_text = "Sorry, I couldn't determine which beach you're asking about for tide information."
-                self.memory.add_message(Message(role="assistant", content=response_text))
-                return self.format_response(response_text)
-            elif self.google_places_client and wants_amenities:
-                if beach:
-                    places = await self.google_places_client.search_places(query=f"{beach} beach amenities")
-                    results = places.results if hasattr(places, 'results') else []
-                    if results:
-                        amenities = ', '.join([r.name for r in results[:5]])
-                        response_text = f"According to Google Places, some amenities near {beach} Beach include: {amenities} (source: Google Places API)"
-                    else:
-                        response_text = f"No amenities found for {beach} Beach on Google Places."
-                else:
-                    response_text = "Sorry, I couldn't determine which beach you're asking about for amenities."
-                self.memory.add_message(Message(role="assistant", content=response_text))
+            response_text = await self._answer_from_sources(message)
+            if response_text is not None:
+                add_message(Message(role="assistant", content=response_text))
                 return self.format_response(response_text)
             # Default: Use LLM
             logger.debug("No relevant keywords found, falling back to LLM.")
             messages = self._prepare_messages()
             response = await self._get_llm_response(messages)
             # Extract only the assistant's message content
-            if hasattr(response, 'choices') and response.choices and hasattr(response.choices[0].message, 'content'):
-                response_text = response.choices[0].message.content or "I don't have a response for that."
-            elif isinstance(response, str):
-                response_text = response
-            else:
-                response_text = "I don't have a response for that."
-            self.memory.add_message(Message(role="assistant", content=response_text))
+            response_text = _extract_text(response)
+            add_message(Message(role="assistant", content=response_text))
             return self.format_response(response_text)
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}", exc_info=True)
-            import traceback
-            logger.error(traceback.format_exc())
-            return "I'm sorry, I encountered an error while processing your request. Please try again later."
+            return _ERROR_RESPONSE
     
-    def _prepare_messages(self) -> List[Dict[str, Any]]:
-        """Prepare messages for the LLM, including any tool definitions."""
-        messages = self.memory.get_messages()
+    async def stream_message(
+        self,
+        message: str,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Process a user message and stream the agent's response.
         
-        # Add tool definitions if any tools are available
-        if self.tools:
-            # Convert tools to the format expected by LiteLLM
-            tools = [tool.to_dict() for tool in self.tools.values()]
-            return [
-                *messages[:-1],  # All messages except the last one
-                {
-                    **messages[-1],  # The last message
-                    "tools": tools
-                }
-            ]
+        Answers from live data sources are yielded as a single chunk. LLM answers
+        are yielded as they are generated. The user and assistant turns are only
+        committed to memory once the stream completes, so an aborted or failed
+        stream leaves the history untouched.
+        """
+        user_message = Message(role="user", content=message)
+        chunks: List[str] = []
+        response_text = None
+        try:
+            answer = await self._answer_from_sources(message)
+            if answer is not None:
+                yield self.format_response(answer)
+                response_text = answer
+                return
+            messages = [*self._prepare_messages(), user_message.as_dict()]
+            # Close the LLM stream promptly if the caller goes away mid-answer
+            async with contextlib.aclosing(self._stream_llm_response(messages)) as stream:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+            if not chunks:
+                yield _NO_RESPONSE
+            response_text = "".join(chunks) or _NO_RESPONSE
+        except Exception as e:
+            logger.error(f"Error streaming message: {str(e)}", exc_info=True)
+            # Don't tack an apology onto a partially streamed answer
+            if not chunks:
+                yield _ERROR_RESPONSE
+        finally:
+            if response_text is not None:
+                self.memory.add_message(user_message)
+                self.memory.add_message(Message(role="assistant", content=response_text))
+    
+    async def process_batch(self, messages: List[str]) -> List[str]:
+        """Answer several independent user messages with at most one LLM call.
+        
+        Messages that can be answered from live data sources are handled
+        individually; the rest are packed into a single numbered prompt and the
+        answers are parsed back from a JSON object. Batched turns are not
+        recorded in conversation memory, since they come from unrelated callers.
+        
+        Args:
+            messages: User messages to answer
+            
+        Returns:
+            One formatted response per message, in the same order
+        """
+        answers = await asyncio.gather(
+            *[self._answer_from_sources(message) for message in messages],
+            return_exceptions=True
+        )
+        results: List[str] = [_ERROR_RESPONSE] * len(messages)
+        pending = []
+        for i, answer in enumerate(answers):
+            if isinstance(answer, Exception):
+                logger.error(f"Error processing batched message: {str(answer)}", exc_info=answer)
+            elif answer is None:
+                pending.append(i)
+            else:
+                results[i] = self.format_response(answer)
         
-        return messages
+        if pending:
+            llm_answers = await self._get_llm_batch_response([messages[i] for i in pending])
+            for i, answer in zip(pending, llm_answers):
+                results[i] = self.format_response(answer)
+        return results
     
+    async def _get_llm_batch_response(self, questions: List[str]) -> List[str]:
+        """Get answers for several questions from a single LLM call.
+        
+        Only the pinned prefix is sent, so no caller sees another's conversation.
+        """
+        prefix = self.memory.get_prefix_messages()
+        if len(questions) == 1:
+            try:
+                return [_extract_text(await self._get_llm_response(
+                    [*prefix, {"role": "user", "content": questions[0]}]
+                ))]
+            except Exception as e:
+                logger.error(f"Error answering batched message: {str(e)}", exc_info=True)
+                return [_ERROR_RESPONSE]
+        
+        numbered = "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+        prompt = (
+            f"Answer each of the following {len(questions)} questions independently. "
+            'Respond only with a JSON object of the form {"answers": ["...", "..."]} '
+            "containing exactly one answer per question, in the same order.\n\n"
+            f"{numbered}"
+        )
+        try:
+            async with self._llm_sem:
+                response = await llm_client.generate(
+                    messages=[*prefix, {"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=1000 * len(questions),
+                    response_format={"type": "json_object"}
+                )
+            answers = _loads(_extract_text(response))["answers"]
+            if isinstance(answers, list) and len(answers) == len(questions):
+                return [str(answer) if answer else _NO_RESPONSE for answer in answers]
+            logger.warning("Batched LLM response had the wrong number of answers, retrying individually")
+        except Exception as e:
+            logger.warning(f"Batched LLM call failed, retrying individually: {str(e)}")
+        
+        # Fall back to one concurrent call per question
+        answers = await asyncio.gather(
+            *[self._get_llm_batch_response([question]) for question in questions]
+        )
+        return [answer[0] for answer in answers]
+    
+    def _prepare_messages(self) -> List[Dict[str, Any]]:
+        """Prepare messages for the LLM.
+        
+        The history is returned as-is so the prompt prefix stays byte-stable
+        across turns; tool definitions are sent separately by _get_llm_response.
+        """
+        return self.memory.get_messages()
+    
+    
+    async def warmup(self) -> bool:
+        """Prefill the system prompt and few-shot prefix on the LLM backend.
+        
+        Sends the pinned prefix with a one-token completion so the backend's
+        prompt cache is populated before the first real request.
+        
+        Returns:
+            bool: True if the backend responded, False otherwise
+        """
+        messages = [*self.memory.get_prefix_messages(), {"role": "user", "content": "ping"}]
+        try:
+            async with self._llm_sem:
+                await llm_client.generate(
+                    messages=messages,
+                    max_tokens=1,
+                    tools=self._tools_payload or None,
+                )
+        except Exception as e:
+            logger.warning(f"LLM warmup failed: {str(e)}")
+            return False
+        return True
     
     async def _get_llm_response(self, messages: List[Dict[str, Any]]) -> Any:
         """Get a response from the language model.
@@ -329,68 +612,141 @@ class BeachAgent(BaseAgent):
                 - If tools are used: Returns the full response object with tool_calls
                 - If no tools: Returns just the text content as a string
         """
-        # Extract tools from the last message if they exist
-        tools = None
-        if messages and "tools" in messages[-1]:
-            tools = messages[-1].pop("tools")
+        tools = self._tools_payload or None
+        
+        # Serve repeated questions for the same conversation state from the cache
+        cache = self.response_cache
+        if cache is not None:
+            cached = await cache.get(messages)
+            if cached is not None:
+                logger.debug("Response cache hit")
+                return cached
         
         # Get response from the LLM using our client
-        response = await llm_client.generate(
-            messages=messages,
-            temperature=0.7,
-            max_tokens=1000,
-            tools=tools
-        )
+        async with self._llm_sem:
+            response = await llm_client.generate(
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1000,
+                tools=tools
+            )
         
-        # If this is a tool call response, return the full response
-        if hasattr(response, 'choices') and hasattr(response.choices[0].message, 'tool_calls'):
+        try:
+            message = response.choices[0].message
+        except (AttributeError, IndexError, TypeError):
+            return response
+        
+        # Only hand back the full response when the model actually requested tools;
+        # LiteLLM always sets the attribute, so check its value rather than its presence
+        if getattr(message, 'tool_calls', None):
             return response
             
         # Otherwise, return just the text content
-        return response.choices[0].message.content
+        content = message.content
+        if cache is not None and content:
+            await cache.set(messages, content)
+        return content
+    
+    async def _stream_llm_response(self, messages: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Stream text content from the language model.
+        
+        Yields:
+            str: Content deltas as they arrive
+        """
+        cache = self.response_cache
+        if cache is not None:
+            cached = await cache.get(messages)
+            if cached is not None:
+                logger.debug("Response cache hit")
+                yield cached
+                return
+        
+        # The LLM is drained into a queue so the semaphore is released as soon as
+        # generation finishes, however slowly the caller consumes the chunks
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def _pump() -> None:
+            try:
+                async with self._llm_sem:
+                    async for chunk in llm_client.stream_generate(
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=1000,
+                        tools=self._tools_payload or None
+                    ):
+                        try:
+                            content = chunk.choices[0].delta.content
+                        except (AttributeError, IndexError):
+                            continue
+                        if content:
+                            queue.put_nowait(content)
+            finally:
+                queue.put_nowait(None)
+        
+        parts = []
+        pump = asyncio.create_task(_pump())
+        try:
+            while (content := await queue.get()) is not None:
+                parts.append(content)
+                yield content
+            # Re-raise any error from the LLM stream
+            await pump
+        finally:
+            pump.cancel()
+        
+        if cache is not None and parts:
+            await cache.set(messages, "".join(parts))
     
     async def _handle_tool_calls(
         self,
         tool_calls: List[Dict[str, Any]]
     ) -> List[Message]:
-        """Handle tool calls and return the results."""
-        tool_responses = []
-        
+        """Handle tool calls concurrently and return the results in call order."""
+        async def _invoke_one(tool_call, tool: Tool) -> Message:
+            # Parse the arguments
+            args = _loads(tool_call.function.arguments)
+
+            # Call the tool, keeping blocking functions off the event loop
+            async with self._tool_sem:
+                if tool._is_coroutine:
+                    result = await tool.function(**args)
+                else:
+                    result = await asyncio.to_thread(tool.function, **args)
+
+            # Add the tool response to the conversation
+            return Message(
+                role="tool",
+                name=tool.name,
+                content=_dumps(result),
+                tool_call_id=tool_call.id
+            )
+
+        tools = self.tools
+        known_calls = []
         for tool_call in tool_calls:
-            tool_name = tool_call.function.name
-            if tool_name not in self.tools:
-                logger.warning(f"Unknown tool: {tool_name}")
+            tool = tools.get(tool_call.function.name)
+            if tool is None:
+                logger.warning(f"Unknown tool: {tool_call.function.name}")
                 continue
-                
-            try:
-                # Parse the arguments
-                args = json.loads(tool_call.function.arguments)
-                
-                # Call the tool
-                tool = self.tools[tool_name]
-                result = tool.function(**args)
-                
-                # If the result is a coroutine, await it
-                if hasattr(result, "__await__"):
-                    result = await result
-                
-                # Add the tool response to the conversation
-                tool_response = Message(
-                    role="tool",
-                    name=tool_name,
-                    content=json.dumps(result),
-                    tool_call_id=tool_call.id
-                )
-                tool_responses.append(tool_response)
-                
-            except Exception as e:
-                logger.error(f"Error calling tool {tool_name}: {str(e)}", exc_info=True)
-                tool_response = Message(
+            known_calls.append((tool_call, tool))
+
+        results = await asyncio.gather(
+            *[_invoke_one(tool_call, tool) for tool_call, tool in known_calls],
+            return_exceptions=True
+        )
+
+        tool_responses = []
+        append = tool_responses.append
+        for (tool_call, tool), result in zip(known_calls, results):
+            if isinstance(result, Exception):
+                tool_name = tool.name
+                logger.error(f"Error calling tool {tool_name}: {str(result)}", exc_info=result)
+                result = Message(
                     role="tool",
                     name=tool_name,
-                    content=f"Error: {str(e)}",
+                    content=f"Error: {str(result)}",
                     tool_call_id=tool_call.id
                 )
-                tool_responses.append(tool_response)
-        
+            append(result)
+
         return tool_responses
@@ -42,6 +42,48 @@ class Settings(BaseSettings):
         env="OLLAMA_MODEL"
     )
     
+    OLLAMA_KEEP_ALIVE: str = Field(
+        default="30m",
+        description="How long Ollama keeps the model and its prompt cache loaded between requests",
+        env="OLLAMA_KEEP_ALIVE"
+    )
+    
+    LLM_WARMUP: bool = Field(
+        default=True,
+        description="Prefill the system prompt and few-shot prefix on the LLM at startup",
+        env="LLM_WARMUP"
+    )
+    
+    LLM_MAX_CONCURRENCY: int = Field(
+        default=4,
+        description="Maximum number of concurrent LLM requests per agent",
+        env="LLM_MAX_CONCURRENCY"
+    )
+    
+    TOOL_MAX_CONCURRENCY: int = Field(
+        default=8,
+        description="Maximum number of concurrent tool invocations per agent",
+        env="TOOL_MAX_CONCURRENCY"
+    )
+    
+    RESPONSE_CACHE_SIZE: int = Field(
+        default=256,
+        description="Number of conversation prefixes kept in the LLM response cache (0 disables it)",
+        env="RESPONSE_CACHE_SIZE"
+    )
+    
+    CHAT_BATCH_WINDOW_MS: int = Field(
+        default=0,
+        description="Milliseconds to coalesce concurrent chat requests into one batch; batched turns are not kept in memory (0 disables batching)",
+        env="CHAT_BATCH_WINDOW_MS"
+    )
+    
+    CHAT_BATCH_MAX_SIZE: int = Field(
+        default=8,
+        description="Maximum number of chat requests answered in one batch",
+        env="CHAT_BATCH_MAX_SIZE"
+    )
+    
     # External APIs
     GOOGLE_PLACES_API_KEY: Optional[str] = Field(
         default=None,
@@ -67,6 +109,25 @@ class Settings(BaseSettings):
         env="NOAA_API_KEY"
     )
     
+    # Outbound HTTP
+    HTTP_MAX_CONNECTIONS: int = Field(
+        default=100,
+        description="Size of the connection pool shared by the NOAA, NWS and Google Places clients",
+        env="HTTP_MAX_CONNECTIONS"
+    )
+    
+    NOAA_API_CACHE_TTL: int = Field(
+        default=900,
+        description="Seconds to cache identical NOAA GET responses (0 disables it)",
+        env="NOAA_API_CACHE_TTL"
+    )
+    
+    GOOGLE_PLACES_CACHE_TTL: int = Field(
+        default=600,
+        description="Seconds to cache identical Google Places JSON responses (0 disables it)",
+        env="GOOGLE_PLACES_CACHE_TTL"
+    )
+    
     # CORS
     CORS_ORIGINS: list[str] = Field(
         default=["*"],
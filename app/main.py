@@ -7,7 +7,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
 
 import logging
-logging.basicConfig(level=logging.DEBUG)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -19,6 +18,10 @@ app = FastAPI(
 # Get settings
 settings = get_settings()
 
+# Verbose logs only in debug mode; debug calls use lazy %-formatting, so they cost
+# almost nothing when the level is disabled
+logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.INFO)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -47,10 +50,26 @@ from app.services.google_places_client import GooglePlacesClient
 from app.services.noaa_client import NoaaApiClient
 from app.services.noaa_nws_client import NoaaNwsClient
 
+import asyncio
+import contextlib
+from typing import AsyncIterator, Optional
+
+import httpx
+
+# One HTTP/2 connection pool shared by all API clients, so concurrent lookups
+# reuse warm connections instead of each paying its own handshakes
+http_transport = httpx.AsyncHTTPTransport(
+    http2=True,
+    limits=httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+    ),
+)
+
 # Instantiate API clients ONCE
-google_places_client = GooglePlacesClient()
-noaa_client = NoaaApiClient()
-noaa_nws_client = NoaaNwsClient()
+google_places_client = GooglePlacesClient(transport=http_transport)
+noaa_client = NoaaApiClient(transport=http_transport)
+noaa_nws_client = NoaaNwsClient(transport=http_transport)
 beach_agent = BeachAgent(
     google_places_client=google_places_client,
     noaa_client=noaa_client,
@@ -59,23 +78,71 @@ beach_agent = BeachAgent(
 
 # All endpoints below use this beach_agent instance
 
+from app.utils.batching import RequestBatcher
+
+# Optionally coalesce concurrent chat requests into batched LLM calls
+chat_batcher = (
+    RequestBatcher(
+        beach_agent.process_batch,
+        max_batch_size=settings.CHAT_BATCH_MAX_SIZE,
+        max_wait=settings.CHAT_BATCH_WINDOW_MS / 1000,
+    )
+    if settings.CHAT_BATCH_WINDOW_MS > 0
+    else None
+)
+
+# Strong reference so the warmup task isn't garbage collected mid-flight
+_warmup_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def startup() -> None:
+    """Warm the LLM prompt cache in the background without delaying startup."""
+    global _warmup_task
+    if settings.LLM_WARMUP:
+        _warmup_task = asyncio.create_task(beach_agent.warmup())
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    """Stop background work and close the shared HTTP connection pool."""
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _warmup_task
+    if chat_batcher is not None:
+        await chat_batcher.close()
+    await http_transport.aclose()
+
 import re
 
+# Bullets, bold, italics and inline code, matched in a single scan
+_MARKDOWN_RE = re.compile(
+    r"^\s*\* "            # bullet point
+    r"|\*\*(.*?)\*\*"     # bold
+    r"|\*(.*?)\*"         # italics
+    r"|`([^`]*)`",         # inline code
+    re.MULTILINE,
+)
+
+def _replace_markdown(match: re.Match) -> str:
+    """Replace one markdown token with its plain-text equivalent."""
+    if match.lastindex is None:
+        return "- "
+    return match.group(match.lastindex)
+
 def markdown_to_plain_text(md: str) -> str:
     """Convert markdown to plain text for easier reading in Swagger."""
-    # Remove bold, italics, and inline code
-    text = re.sub(r"\*\*(.*?)\*\*", r"\1", md)
-    text = re.sub(r"\*(.*?)\*", r"\1", text)
-    text = re.sub(r"`([^`]*)`", r"\1", text)
-    # Replace bullet points with dashes
-    text = re.sub(r"^\s*\* ", "- ", text, flags=re.MULTILINE)
-    # Replace newlines with actual line breaks (for Swagger, use <br> or leave as is)
-    text = text.replace("\n", "\n")  # Swagger will still show \n, but this is the best we can do in JSON
-    return text
+    # Strip emphasis and inline code, and replace bullet points with dashes;
+    # nested markup loses one layer per pass, so repeat until nothing changes
+    while True:
+        plain = _MARKDOWN_RE.sub(_replace_markdown, md)
+        if plain == md:
+            return plain
+        md = plain
 
 from fastapi import Body
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+import json
 
 class ChatMessage(BaseModel):
     role: str = Field(..., description="Message role: 'user' or 'assistant'")
@@ -93,10 +160,41 @@ async def chat_endpoint(
         "message": "What are the best beaches for surfing in Florida?"
     })
 ):
-    """General chat endpoint for free-form questions to the BeachAgent."""
-    agent_response = await beach_agent.process_message(chat.message)
+    """General chat endpoint for free-form questions to the BeachAgent.
+    
+    When CHAT_BATCH_WINDOW_MS is set, requests are answered in batches and,
+    since batched callers are unrelated, their turns are not recorded in the
+    conversation memory.
+    """
+    if chat_batcher is not None:
+        agent_response = await chat_batcher.submit(chat.message)
+    else:
+        agent_response = await beach_agent.process_message(chat.message)
     return ChatResponse(message=agent_response)
 
+async def _sse_events(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Wrap text chunks as server-sent events, ending with a [DONE] event."""
+    async for chunk in chunks:
+        # JSON-encode so newlines inside a chunk don't break the event framing
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+@app.post("/api/v1/chat/stream")
+async def chat_stream_endpoint(
+    chat: ChatRequest = Body(..., example={
+        "message": "What are the best beaches for surfing in Florida?"
+    })
+):
+    """Chat endpoint that streams the agent's reply as server-sent events.
+    
+    Each event carries a JSON-encoded text chunk; the stream ends with [DONE].
+    """
+    return StreamingResponse(
+        _sse_events(beach_agent.stream_message(chat.message)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
 @app.get("/api/v1/beaches/{beach_name}")
 async def get_beach_info(beach_name: str):
     """Get information about a specific beach via the BeachAgent.
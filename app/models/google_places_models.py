@@ -2,24 +2,20 @@
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional, Dict, Any, Union, Literal, Annotated
-from pydantic import BaseModel, Field, validator, HttpUrl, field_validator, BeforeValidator, ConfigDict
+from pydantic import (
+    BaseModel, Field, HttpUrl, TypeAdapter, ValidationError, ValidatorFunctionWrapHandler,
+    field_validator, BeforeValidator, WrapValidator,
+)
 
 
-def convert_price_level(value: Any) -> Optional[str]:
-    """Convert price level from various input types to string enum."""
-    if value is None:
-        return None
-    if isinstance(value, str):
-        return value.lower()
-    if isinstance(value, int):
-        return {
-            0: "free",
-            1: "inexpensive",
-            2: "moderate",
-            3: "expensive",
-            4: "very_expensive"
-        }.get(value, None)
-    return None
+# URL fields are kept as plain strings since Google returns well-formed URLs;
+# use validate_http_url when a parsed, checked URL is actually needed
+_HTTP_URL_ADAPTER = TypeAdapter(HttpUrl)
+
+
+def validate_http_url(url: str) -> HttpUrl:
+    """Parse and validate a URL string from a Places response."""
+    return _HTTP_URL_ADAPTER.validate_python(url)
 
 
 class PlacePriceLevel(str, Enum):
@@ -31,10 +27,36 @@ class PlacePriceLevel(str, Enum):
     VERY_EXPENSIVE = "very_expensive"
 
 
+# Lookup tables built once rather than on every validation
+_PRICE_LEVEL_BY_INT = tuple(PlacePriceLevel)
+_PRICE_LEVEL_VALUES = frozenset(level.value for level in PlacePriceLevel)
+
+
+def convert_price_level(value: Any) -> Optional[str]:
+    """Convert price level from an int (0-4) or string to its enum value."""
+    if isinstance(value, int):
+        if 0 <= value < len(_PRICE_LEVEL_BY_INT):
+            return _PRICE_LEVEL_BY_INT[value].value
+        return None
+    if isinstance(value, str):
+        value = value.lower()
+        if value in _PRICE_LEVEL_VALUES:
+            return value
+    return None
+
+
 class PlaceOpeningHoursPeriodDetail(BaseModel):
     """Details about when a place opens or closes."""
     day: int = Field(..., ge=0, le=6, description="Day of the week (0-6, where 0 is Sunday)")
-    time: str = Field(..., pattern=r'^([0-1]?[0-9]|2[0-3])[0-5][0-9]$', description="24-hour time in HHMM format")
+    time: str = Field(..., description="24-hour time in HHMM format")
+    
+    @field_validator('time')
+    @classmethod
+    def validate_time(cls, v: str) -> str:
+        # Plain string checks; a regex is overkill for a 3-4 digit value
+        if not (3 <= len(v) <= 4 and v.isascii() and v.isdigit() and int(v[:-2]) < 24 and v[-2:] < "60"):
+            raise ValueError("time must be in HHMM format")
+        return v
 
 
 class PlaceOpeningHoursPeriod(BaseModel):
@@ -58,13 +80,36 @@ class PlacePhoto(BaseModel):
     html_attributions: List[str] = Field(default_factory=list, alias="html_attributions")
 
 
+def _drop_invalid_photos(value: Any, handler: ValidatorFunctionWrapHandler) -> Any:
+    """Validate photos one by one, skipping any that are malformed."""
+    if not isinstance(value, list):
+        return handler(value)
+    photos = []
+    for photo in value:
+        try:
+            photos.extend(handler([photo]))
+        except ValidationError:
+            continue
+    return photos
+
+
+# A bad photo shouldn't cost the whole place (or search) its validation
+PlacePhotos = Annotated[Optional[List[PlacePhoto]], WrapValidator(_drop_invalid_photos)]
+
+
+class PlusCode(BaseModel):
+    """Open Location Code for a place."""
+    global_code: str
+    compound_code: Optional[str] = None
+
+
 class PlaceReview(BaseModel):
     """Review for a place."""
     author_name: str = Field(..., alias="author_name")
-    author_url: Optional[HttpUrl] = Field(None, alias="author_url")
+    author_url: Optional[str] = Field(None, alias="author_url")
     language: Optional[str] = None
     original_language: Optional[str] = Field(None, alias="original_language")
-    profile_photo_url: Optional[HttpUrl] = Field(None, alias="profile_photo_url")
+    profile_photo_url: Optional[str] = Field(None, alias="profile_photo_url")
     rating: float = Field(..., ge=1, le=5)
     relative_time_description: str = Field(..., alias="relative_time_description")
     text: str
@@ -92,7 +137,6 @@ class PlaceGeometry(BaseModel):
 
 class Place(BaseModel):
     """Detailed information about a place."""
-    model_config = ConfigDict(extra='allow')  # Allow extra fields from API
     
     place_id: str = Field(..., alias="place_id")
     name: str
@@ -100,7 +144,7 @@ class Place(BaseModel):
     geometry: PlaceGeometry
     formatted_phone_number: Optional[str] = Field(None, alias="formatted_phone_number")
     international_phone_number: Optional[str] = Field(None, alias="international_phone_number")
-    website: Optional[HttpUrl] = None
+    website: Optional[str] = None
     rating: Optional[float] = Field(None, ge=1, le=5)
     user_ratings_total: Optional[int] = Field(None, alias="user_ratings_total", ge=0)
     price_level: Optional[PlacePriceLevel] = Field(
@@ -110,19 +154,20 @@ class Place(BaseModel):
     )
     types: List[str] = Field(default_factory=list)
     opening_hours: Optional[PlaceOpeningHours] = Field(None, alias="opening_hours")
-    photos: Optional[List[PlacePhoto]] = None
+    photos: PlacePhotos = None
     reviews: Optional[List[PlaceReview]] = None
     permanently_closed: Optional[bool] = Field(None, alias="permanently_closed")
     business_status: Optional[str] = Field(None, alias="business_status")
     vicinity: Optional[str] = None
-    url: Optional[HttpUrl] = None
+    url: Optional[str] = None
     utc_offset: Optional[int] = Field(None, alias="utc_offset")
     adr_address: Optional[str] = Field(None, alias="adr_address")
-    plus_code: Optional[Dict[str, Any]] = Field(None, alias="plus_code")
+    plus_code: Optional[PlusCode] = Field(None, alias="plus_code")
     reference: Optional[str] = None
     scope: Optional[str] = None
     
-    @validator('types', pre=True)
+    @field_validator('types', mode='before')
+    @classmethod
     def ensure_types_list(cls, v):
         if v is None:
             return []
@@ -130,15 +175,10 @@ class Place(BaseModel):
             return [v]
         return v
         
-    @validator('price_level', pre=True)
+    @field_validator('price_level', mode='before')
+    @classmethod
     def validate_price_level(cls, v):
-        if v is None:
-            return None
-        if isinstance(v, int) and 0 <= v <= 4:
-            return list(PlacePriceLevel)[v].value
-        if isinstance(v, str) and v.lower() in [e.value for e in PlacePriceLevel]:
-            return v.lower()
-        return None
+        return convert_price_level(v)
 
 
 class PlaceSearchResult(BaseModel):
@@ -152,12 +192,13 @@ class PlaceSearchResult(BaseModel):
     price_level: Optional[Union[int, PlacePriceLevel]] = Field(None, alias="price_level")
     types: List[str] = Field(default_factory=list)
     business_status: Optional[str] = Field(None, alias="business_status")
-    plus_code: Optional[Dict[str, Any]] = Field(None, alias="plus_code")
+    plus_code: Optional[PlusCode] = Field(None, alias="plus_code")
     opening_hours: Optional[Dict[str, bool]] = Field(None, alias="opening_hours")
     permanently_closed: Optional[bool] = Field(None, alias="permanently_closed")
-    photos: Optional[List[Dict[str, Any]]] = None
+    photos: PlacePhotos = None
     
-    @validator('types', pre=True)
+    @field_validator('types', mode='before')
+    @classmethod
     def ensure_types_list(cls, v):
         if v is None:
             return []
@@ -170,3 +211,17 @@ class PlaceSearchResponse(BaseModel):
     next_page_token: Optional[str] = Field(None, alias="next_page_token")
     status: str
     error_message: Optional[str] = Field(None, alias="error_message")
+
+
+class PlaceDetailsResponse(BaseModel):
+    """Response from Google Places API place details."""
+    result: Optional[Place] = None
+    status: Optional[str] = None
+    error_message: Optional[str] = Field(None, alias="error_message")
+
+
+class FindPlaceResponse(BaseModel):
+    """Response from Google Places API find place."""
+    candidates: List[PlaceSearchResult] = Field(default_factory=list)
+    status: Optional[str] = None
+    error_message: Optional[str] = Field(None, alias="error_message")
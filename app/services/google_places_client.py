@@ -1,38 +1,67 @@
 """Client for interacting with the Google Places API."""
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
 import httpx
+import orjson
 from pydantic import HttpUrl, ValidationError
 
 from app.config import get_settings
+from app.utils.async_cache import AsyncTTLCache
 from app.models.google_places_models import (
+    FindPlaceResponse,
     Place,
+    PlaceDetailsResponse,
     PlaceSearchResponse,
     PlaceSearchResult,
 )
 
 logger = logging.getLogger(__name__)
 
+# Get settings
+settings = get_settings()
+
+# Statuses worth caching; anything else (quota, denied, invalid) may be transient
+_CACHEABLE_STATUSES = frozenset({"OK", "ZERO_RESULTS"})
+
+
+def _is_cacheable(raw: bytes) -> bool:
+    """Whether a Places JSON body reports a status worth caching."""
+    try:
+        return orjson.loads(raw).get("status") in _CACHEABLE_STATUSES
+    except (orjson.JSONDecodeError, AttributeError):
+        return False
+
 
 class GooglePlacesClient:
     """Client for Google Places API."""
     
     BASE_URL = "https://maps.googleapis.com/maps/api/place"
     
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         """Initialize the Google Places API client.
         
         Args:
             client: Optional httpx.AsyncClient instance (for testing)
+            transport: Optional transport, e.g. a connection pool shared with other clients
         """
-        self.settings = get_settings()
-        self.api_key = self.settings.GOOGLE_PLACES_API_KEY
+        self.api_key = settings.GOOGLE_PLACES_API_KEY
+        # Injected clients and transports are owned (and closed) by the caller
+        self._owns_client = client is None and transport is None
         self._client = client or httpx.AsyncClient(
             base_url=self.BASE_URL,
             timeout=10.0,
             follow_redirects=True,
+            http2=True,
+            transport=transport,
         )
+        ttl = settings.GOOGLE_PLACES_CACHE_TTL
+        self._cache = AsyncTTLCache(ttl=ttl) if ttl > 0 else None
     
     async def __aenter__(self):
         return self
@@ -41,8 +70,9 @@ class GooglePlacesClient:
         await self.close()
     
     async def close(self) -> None:
-        """Close the HTTP client session."""
-        await self._client.aclose()
+        """Close the HTTP client session if this client created it."""
+        if self._owns_client:
+            await self._client.aclose()
     
     async def _make_request(
         self, 
@@ -50,21 +80,48 @@ class GooglePlacesClient:
         endpoint: str, 
         params: Optional[Dict[str, Any]] = None,
         is_binary: bool = False
-    ) -> Union[Dict[str, Any], bytes]:
+    ) -> bytes:
+        """Make an HTTP request, serving repeated JSON GETs from the cache.
+        
+        Takes the same arguments as _send_request. Binary responses (photos)
+        are never cached.
+        """
+        if self._cache is None or method != "GET" or is_binary:
+            return await self._send_request(method, endpoint, params, is_binary)
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        fetched = False
+        
+        async def fetch() -> bytes:
+            nonlocal fetched
+            fetched = True
+            return await self._send_request(method, endpoint, params, is_binary)
+        
+        raw = await self._cache.get_or_set(key, fetch)
+        if fetched and not _is_cacheable(raw):
+            # Served as-is but not kept, so a quota hit doesn't outlive the TTL
+            self._cache.discard(key)
+        return raw
+    
+    async def _send_request(
+        self, 
+        method: str, 
+        endpoint: str, 
+        params: Optional[Dict[str, Any]] = None,
+        is_binary: bool = False
+    ) -> bytes:
         """Make an HTTP request to the Google Places API.
         
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint (e.g., '/nearbysearch/json')
             params: Query parameters
-            is_binary: Whether to return binary data (for photos)
+            is_binary: Whether the response is binary data (for photos)
             
         Returns:
-            Dict containing the JSON response or bytes for binary data
+            The raw response body; JSON bodies are validated by the caller
             
         Raises:
             httpx.HTTPStatusError: If the request fails
-            ValidationError: If the response cannot be validated
         """
         if params is None:
             params = {}
@@ -78,47 +135,21 @@ class GooglePlacesClient:
                 url=endpoint,
                 params=params
             )
+            response.raise_for_status()
             
             # For binary responses (like photos), just return the content
             if is_binary:
-                response.raise_for_status()
                 return await response.aread()
-                
-            # For JSON responses, parse and return
-            logger.debug("Response status: %s", response.status_code)
-            logger.debug("Response headers: %s", response.headers)
             
-            # Ensure we await the raise_for_status coroutine
-            if hasattr(response, 'raise_for_status'):
-                response.raise_for_status()
-            
-            # Get the response data
-            if hasattr(response, 'json') and callable(response.json):
-                result = response.json()
-                # If result is a coroutine, await it
-                if hasattr(result, '__await__'):
-                    data = await result
-                else:
-                    data = result
-                logger.debug("Response data (parsed): %s", data)
-                return data
-            else:
-                # If no json method, try to get text and parse manually
-                response_text = await response.text()
-                logger.debug("Raw response text: %s", response_text)
-                try:
-                    import json
-                    return json.loads(response_text)
-                except json.JSONDecodeError as e:
-                    logger.error("Failed to parse JSON response: %s", e)
-                    logger.error("Response content: %s", response_text)
-                    raise ValueError(f"Failed to parse JSON response: {e}") from e
+            logger.debug("Response status: %s", response.status_code)
+            # Hand back the raw bytes so pydantic parses and validates in one pass
+            return response.content
             
         except httpx.HTTPStatusError as e:
             logger.error(
                 "HTTP error %s: %s",
                 e.response.status_code,
-                e.response.text if hasattr(e, 'response') else str(e),
+                e.response.text,
                 exc_info=True
             )
             raise
@@ -129,7 +160,7 @@ class GooglePlacesClient:
     async def search_places(
         self,
         query: Optional[str] = None,
-        location: Optional[Dict[str, float]] = None,
+        location: Optional[Union[Tuple[float, float], Dict[str, float]]] = None,
         radius: Optional[int] = None,
         type: Optional[str] = None,
         language: str = "en",
@@ -139,8 +170,17 @@ class GooglePlacesClient:
         open_now: bool = False,
         page_token: Optional[str] = None,
     ) -> PlaceSearchResponse:
-        """Search for places using Google Places API."""
-        logger.debug(f"[GooglePlacesClient] Calling Places API with query: {query}, location: {location}, radius: {radius}, type: {type}")
+        """Search for places using Google Places API.
+        
+        location may be a (lat, lng) tuple or a {"lat": ..., "lng": ...} dict.
+        """
+        logger.debug(
+            "[GooglePlacesClient] Calling Places API with query: %s, location: %s, radius: %s, type: %s",
+            query,
+            location,
+            radius,
+            type,
+        )
         endpoint = "/nearbysearch/json" if query is None else "/textsearch/json"
         params: Dict[str, Any] = {
             "language": language,
@@ -150,7 +190,9 @@ class GooglePlacesClient:
             params["query"] = query
         
         if location:
-            params["location"] = f"{location['lat']},{location['lng']}"
+            if isinstance(location, dict):
+                location = (location["lat"], location["lng"])
+            params["location"] = f"{location[0]},{location[1]}"
         
         if radius is not None:
             params["radius"] = radius
@@ -173,10 +215,12 @@ class GooglePlacesClient:
         if page_token:
             params["pagetoken"] = page_token
         
-        data = await self._make_request("GET", endpoint, params)
-        if isinstance(data, dict):
-            return PlaceSearchResponse(**data)
-        return PlaceSearchResponse(status="UNKNOWN_ERROR", results=[])
+        raw = await self._make_request("GET", endpoint, params)
+        try:
+            return PlaceSearchResponse.model_validate_json(raw)
+        except ValidationError as e:
+            logger.error("Invalid search response from Google Places API: %s", e)
+            return PlaceSearchResponse(status="UNKNOWN_ERROR", results=[])
     
     async def get_place_details(
         self,
@@ -213,21 +257,37 @@ class GooglePlacesClient:
         if session_token:
             params["sessiontoken"] = session_token
         
-        data = await self._make_request("GET", endpoint, params)
-        logger.debug("Response data in get_place_details: %s", data)
-        if isinstance(data, dict):
-            logger.debug("Response keys: %s", data.keys())
-            if "result" in data:
-                logger.debug("Result data: %s", data["result"])
-                try:
-                    place = Place(**data["result"])
-                    logger.debug("Successfully created Place object")
-                    return place
-                except Exception as e:
-                    logger.error("Failed to create Place object: %s", e, exc_info=True)
-                    raise
-        logger.error("Invalid response format: %s", data)
-        raise ValueError("Invalid response format from Google Places API")
+        raw = await self._make_request("GET", endpoint, params)
+        details = PlaceDetailsResponse.model_validate_json(raw)
+        if details.result is None:
+            logger.error("Invalid response format: %s", raw)
+            raise ValueError("Invalid response format from Google Places API")
+        return details.result
+    
+    async def get_places_details_batch(
+        self,
+        place_ids: List[str],
+        *,
+        concurrency: int = 32,
+        **kwargs: Any,
+    ) -> List[Place]:
+        """Get details for several places concurrently.
+        
+        Args:
+            place_ids: Place IDs to look up
+            concurrency: Maximum number of requests in flight at once
+            **kwargs: Additional arguments passed to get_place_details
+            
+        Returns:
+            Place objects in the same order as place_ids
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(place_id: str) -> Place:
+            async with semaphore:
+                return await self.get_place_details(place_id, **kwargs)
+        
+        return await asyncio.gather(*(fetch(place_id) for place_id in place_ids))
     
     async def find_place(
         self,
@@ -262,10 +322,8 @@ class GooglePlacesClient:
         if location_bias:
             params["locationbias"] = location_bias
         
-        data = await self._make_request("GET", endpoint, params)
-        if isinstance(data, dict) and "candidates" in data:
-            return [PlaceSearchResult(**candidate) for candidate in data["candidates"]]
-        return []
+        raw = await self._make_request("GET", endpoint, params)
+        return FindPlaceResponse.model_validate_json(raw).candidates
     
     async def get_place_photo(
         self,
@@ -287,18 +345,8 @@ class GooglePlacesClient:
             httpx.HTTPStatusError: If the photo request fails
             ValueError: If the photo data is empty
         """
-        if not (max_width or max_height):
-            max_width = 400  # Default width if none specified
-            
         endpoint = "/photo"
-        params: Dict[str, Any] = {
-            "photoreference": photo_reference,
-        }
-        
-        if max_width:
-            params["maxwidth"] = max_width
-        if max_height:
-            params["maxheight"] = max_height
+        params = self._photo_params(photo_reference, max_width, max_height)
             
         try:
             photo_data = await self._make_request(
@@ -316,3 +364,91 @@ class GooglePlacesClient:
         except Exception as e:
             logger.error("Error fetching photo: %s", str(e), exc_info=True)
             raise
+    
+    async def stream_place_photo(
+        self,
+        photo_reference: str,
+        sink: BinaryIO,
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> int:
+        """Stream a place photo into a writable binary sink.
+        
+        Unlike get_place_photo, the image is never held in memory as a whole,
+        so large photos can be written to disk or forwarded chunk by chunk.
+        
+        Args:
+            photo_reference: String used to identify the photo to retrieve
+            sink: Binary file-like object the photo data is written to
+            max_width: The maximum desired width of the image
+            max_height: The maximum desired height of the image
+            chunk_size: Number of bytes read per chunk
+            
+        Returns:
+            Number of bytes written
+            
+        Raises:
+            httpx.HTTPStatusError: If the photo request fails
+            ValueError: If the photo data is empty
+        """
+        params = self._photo_params(photo_reference, max_width, max_height)
+        params["key"] = self.api_key
+        written = 0
+        try:
+            async with self._client.stream("GET", "/photo", params=params) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    sink.write(chunk)
+                    written += len(chunk)
+        except Exception as e:
+            logger.error("Error streaming photo: %s", str(e), exc_info=True)
+            raise
+        if not written:
+            raise ValueError("Received empty photo data from Google Places API")
+        return written
+    
+    @staticmethod
+    def _photo_params(
+        photo_reference: str,
+        max_width: Optional[int],
+        max_height: Optional[int],
+    ) -> Dict[str, Any]:
+        """Build query parameters for the photo endpoint."""
+        if not (max_width or max_height):
+            max_width = 400  # Default width if none specified
+        
+        params: Dict[str, Any] = {
+            "photoreference": photo_reference,
+        }
+        
+        if max_width:
+            params["maxwidth"] = max_width
+        if max_height:
+            params["maxheight"] = max_height
+        return params
+    
+    async def get_place_photos_batch(
+        self,
+        photo_references: List[str],
+        *,
+        concurrency: int = 32,
+        **kwargs: Any,
+    ) -> List[bytes]:
+        """Get several place photos concurrently.
+        
+        Args:
+            photo_references: Photo references to fetch
+            concurrency: Maximum number of requests in flight at once
+            **kwargs: Additional arguments passed to get_place_photo
+            
+        Returns:
+            Photo data in the same order as photo_references
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(photo_reference: str) -> bytes:
+            async with semaphore:
+                return await self.get_place_photo(photo_reference, **kwargs)
+        
+        return await asyncio.gather(*(fetch(ref) for ref in photo_references))
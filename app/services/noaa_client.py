@@ -1,12 +1,14 @@
 """Client for interacting with the NOAA Tides & Currents API."""
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import httpx
-from pydantic import HttpUrl, ValidationError
+import orjson
+from pydantic import HttpUrl, TypeAdapter, ValidationError
 
 from app.config import get_settings
+from app.utils.async_cache import AsyncTTLCache
 from app.models.noaa_models import (
     NoaaStation,
     NoaaTidePrediction,
@@ -17,24 +19,85 @@ from app.models.noaa_models import (
 
 logger = logging.getLogger(__name__)
 
+# Get settings
+settings = get_settings()
+
+_STATIONS_ADAPTER = TypeAdapter(List[NoaaStation])
+
+DateLike = Union[str, datetime]
+
+
+def _format_date(value: DateLike) -> str:
+    """Format a datetime as NOAA's YYYYMMDD; strings are passed through."""
+    if isinstance(value, datetime):
+        # Cheaper than strftime for a fixed format
+        return f"{value.year:04d}{value.month:02d}{value.day:02d}"
+    return value
+
+
+def _date_range(
+    date: Optional[DateLike],
+    begin_date: Optional[DateLike],
+    end_date: Optional[DateLike],
+    default_begin: datetime,
+    default_end: Optional[datetime] = None,
+) -> Tuple[str, str]:
+    """Resolve NOAA begin/end date parameters.
+    
+    A single date wins over a range. A missing end date defaults to
+    default_end, or to one day after the begin date.
+    """
+    if date:
+        date = _format_date(date)
+        return date, date
+    if not begin_date:
+        begin_date = default_begin
+    if not end_date:
+        if default_end is not None:
+            end_date = default_end
+        else:
+            begin = begin_date
+            if not isinstance(begin, datetime):
+                begin = datetime.strptime(begin, "%Y%m%d")
+            end_date = begin + timedelta(days=1)
+    return _format_date(begin_date), _format_date(end_date)
+
+
+def _is_empty(data: Dict) -> bool:
+    """Whether a NOAA payload is an error or has only empty record lists."""
+    if not data or "error" in data:
+        return True
+    records = [value for value in data.values() if isinstance(value, list)]
+    return bool(records) and not any(records)
+
 
 class NoaaApiClient:
     """Client for NOAA Tides & Currents API."""
     
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         """Initialize the NOAA API client.
         
         Args:
             client: Optional httpx.AsyncClient instance (for testing)
+            transport: Optional transport, e.g. a connection pool shared with other clients
         """
-        self.settings = get_settings()
-        self.base_url = self.settings.NOAA_API_BASE_URL.rstrip("/") + "/"
-        self.timeout = self.settings.NOAA_API_TIMEOUT
+        self.base_url = settings.NOAA_API_BASE_URL.rstrip("/") + "/"
+        self.timeout = settings.NOAA_API_TIMEOUT
+        # Injected clients and transports are owned (and closed) by the caller
+        self._owns_client = client is None and transport is None
         self._client = client or httpx.AsyncClient(
             base_url=self.base_url,
             timeout=self.timeout,
             follow_redirects=True,
+            http2=True,
+            transport=transport,
         )
+        ttl = settings.NOAA_API_CACHE_TTL
+        self._cache = AsyncTTLCache(ttl=ttl) if ttl > 0 else None
     
     async def __aenter__(self):
         return self
@@ -43,8 +106,8 @@ class NoaaApiClient:
         await self.close()
     
     async def close(self):
-        """Close the HTTP client."""
-        if self._client:
+        """Close the HTTP client if this client created it."""
+        if self._owns_client:
             await self._client.aclose()
     
     async def _make_request(
@@ -52,6 +115,28 @@ class NoaaApiClient:
         method: str,
         endpoint: str,
         params: Optional[Dict] = None,
+    ) -> Dict:
+        """Make an HTTP request, serving repeated GETs from the cache.
+        
+        Takes the same arguments as _send_request. Cached responses are shared
+        between callers and must not be mutated.
+        """
+        if self._cache is None or method != "GET":
+            return await self._send_request(method, endpoint, params)
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        data = await self._cache.get_or_set(
+            key, lambda: self._send_request(method, endpoint, params)
+        )
+        if _is_empty(data):
+            # Served as-is but not kept, so data published later is picked up
+            self._cache.discard(key)
+        return data
+    
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
     ) -> Dict:
         """Make an HTTP request to the NOAA API.
         
@@ -81,7 +166,7 @@ class NoaaApiClient:
                 params=params or {},
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except httpx.HTTPStatusError as e:
             logger.error(
                 "HTTP error %s: %s",
@@ -119,25 +204,19 @@ class NoaaApiClient:
         Returns:
             List of tide predictions
         """
-        logger.debug(f"[NoaaApiClient] Requesting tide predictions for station: {station_id}, begin_date: {begin_date}, end_date: {end_date}, interval: {interval}")
+        logger.debug(
+            "[NoaaApiClient] Requesting tide predictions for station: %s, begin_date: %s, end_date: %s, interval: %s",
+            station_id,
+            begin_date,
+            end_date,
+            interval,
+        )
         endpoint = f"stations/{station_id}/tide_predictions.json"
         
-        # Format dates
-        if date:
-            if isinstance(date, datetime):
-                date = date.strftime("%Y%m%d")
-            begin_date = date
-            end_date = date
-        else:
-            if not begin_date:
-                begin_date = datetime.utcnow()
-            if not end_date:
-                end_date = begin_date + timedelta(days=1)
-                
-            if isinstance(begin_date, datetime):
-                begin_date = begin_date.strftime("%Y%m%d")
-            if isinstance(end_date, datetime):
-                end_date = end_date.strftime("%Y%m%d")
+        # Default to the day starting now
+        begin_date, end_date = _date_range(
+            date, begin_date, end_date, default_begin=datetime.utcnow()
+        )
         
         params = {
             "begin_date": begin_date,
@@ -185,22 +264,13 @@ class NoaaApiClient:
         """
         endpoint = f"stations/{station_id}/water_temperature.json"
         
-        # Format dates
-        if date:
-            if isinstance(date, datetime):
-                date = date.strftime("%Y%m%d")
-            begin_date = date
-            end_date = date
-        else:
-            if not begin_date:
-                begin_date = datetime.utcnow() - timedelta(days=1)
-            if not end_date:
-                end_date = datetime.utcnow()
-                
-            if isinstance(begin_date, datetime):
-                begin_date = begin_date.strftime("%Y%m%d")
-            if isinstance(end_date, datetime):
-                end_date = end_date.strftime("%Y%m%d")
+        # Default to the last day
+        now = datetime.utcnow()
+        begin_date, end_date = _date_range(
+            date, begin_date, end_date,
+            default_begin=now - timedelta(days=1),
+            default_end=now,
+        )
         
         params = {
             "begin_date": begin_date,
@@ -241,22 +311,18 @@ class NoaaApiClient:
         Returns:
             List of nearby stations
         """
-        endpoint = "stations.json"
-        
-        params = {
-            "lat": lat,
-            "lng": lng,
-            "radius": radius,
-            "units": units,
-            "application": "beach-ai",
-            "format": "json",
-        }
-        
-        data = await self._make_request("GET", endpoint, params=params)
+        data = await self._request_stations(lat, lng, radius, units)
         
         try:
+            station_list = data.get("stations", [])
+            try:
+                # Validate the whole list in one call; bad rows are rare
+                return _STATIONS_ADAPTER.validate_python(station_list)
+            except ValidationError:
+                pass
+            # Fall back to dropping only the invalid stations
             stations = []
-            for station_data in data.get("stations", []):
+            for station_data in station_list:
                 try:
                     station = NoaaStation(**station_data)
                     stations.append(station)
@@ -266,3 +332,50 @@ class NoaaApiClient:
         except Exception as e:
             logger.error("Error processing stations response: %s", str(e))
             raise
+    
+    async def find_stations_raw(
+        self,
+        lat: float,
+        lng: float,
+        radius: float = 50.0,
+        units: str = "metric",
+    ) -> List[Tuple[str, str, float, float, Optional[float]]]:
+        """Find tide stations near a location without model validation.
+        
+        A cheaper alternative to find_stations for callers that only pass the
+        stations through (e.g. map markers or distance sorting). Rows are not
+        validated, so malformed API data surfaces as KeyError instead of being
+        skipped.
+        
+        Args:
+            lat: Latitude of the search location
+            lng: Longitude of the search location
+            radius: Search radius in kilometers
+            units: Distance units (metric or english)
+            
+        Returns:
+            List of (id, name, lat, lng, distance) tuples
+        """
+        data = await self._request_stations(lat, lng, radius, units)
+        return [
+            (s["id"], s["name"], s["lat"], s["lng"], s.get("distance"))
+            for s in data.get("stations", [])
+        ]
+    
+    async def _request_stations(
+        self,
+        lat: float,
+        lng: float,
+        radius: float,
+        units: str,
+    ) -> Dict:
+        """Fetch the raw stations response for a location."""
+        params = {
+            "lat": lat,
+            "lng": lng,
+            "radius": radius,
+            "units": units,
+            "application": "beach-ai",
+            "format": "json",
+        }
+        return await self._make_request("GET", "stations.json", params=params)
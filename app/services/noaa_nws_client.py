@@ -1,5 +1,18 @@
+import asyncio
+import logging
+import time
+
 import httpx
-from typing import Optional, Dict, Any
+import orjson
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.utils.async_cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
+
+# Transport/HTTP failures and malformed payloads; anything else is a bug and propagates
+_FETCH_ERRORS = (httpx.HTTPError, LookupError, TypeError, ValueError)
+
 
 class NoaaNwsClient:
     """
@@ -7,67 +20,228 @@ class NoaaNwsClient:
     Docs: https://www.weather.gov/documentation/services-web-api
     """
     BASE_URL = "https://api.weather.gov"
+    POINTS_URL = BASE_URL + "/points/{},{}"
+    LATEST_OBS_URL = BASE_URL + "/stations/{}/observations/latest"
+    # /points metadata (grid office, station list) is effectively static
+    POINTS_CACHE_TTL = 24 * 60 * 60
+    # Failed /points lookups (e.g. coordinates outside NWS coverage) are not retried for a minute
+    POINTS_FAILURE_TTL = 60
+    # Period fields callers usually need; the rest (e.g. detailedForecast prose) is dropped
+    FORECAST_SUMMARY_FIELDS = (
+        "name", "temperature", "temperatureUnit", "shortForecast", "windSpeed", "windDirection"
+    )
+    # Forecasts and observations are refreshed roughly hourly
+    RESPONSE_CACHE_TTL = 10 * 60
+    # NWS has brief 5xx flaps; retry those a few times with exponential backoff
+    MAX_RETRIES = 2
+    RETRY_BACKOFF = 0.5
 
-    def __init__(self, user_agent: str = "beach-ai/1.0 (contact@example.com)"):
+    def __init__(
+        self,
+        user_agent: str = "beach-ai/1.0 (contact@example.com)",
+        client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         self.user_agent = user_agent
         self.headers = {
             "User-Agent": self.user_agent,
             "Accept": "application/geo+json,application/json"
         }
+        # One long-lived client so connections are kept alive between calls
+        # Injected clients and transports are owned (and closed) by the caller
+        self._owns_client = client is None and transport is None
+        self._client = client or httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=90),
+            transport=transport,
+        )
+        # Our own client sends the headers by default; injected ones need them per request
+        self._request_headers = None if client is None else self.headers
+        self._points_cache = AsyncTTLCache(ttl=self.POINTS_CACHE_TTL, maxsize=1024)
+        self._forecast_cache = AsyncTTLCache(ttl=self.RESPONSE_CACHE_TTL, maxsize=4096)
+        self._obs_cache = AsyncTTLCache(ttl=self.RESPONSE_CACHE_TTL, maxsize=4096)
+        self._station_cache = AsyncTTLCache(ttl=self.POINTS_CACHE_TTL, maxsize=1024)
+        self._points_failures: Dict[Tuple[float, float], float] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the HTTP client if this client created it."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    def clear_cache(self) -> None:
+        """Drop all cached points, stations, forecasts and observations."""
+        for cache in (self._points_cache, self._station_cache, self._forecast_cache, self._obs_cache):
+            cache.clear()
+        self._points_failures.clear()
+
+    async def _get_points(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Get the /points properties for a location, cached per grid point.
+        NWS only resolves coordinates to 4 decimal places, so they are rounded.
+        A failed lookup is remembered for POINTS_FAILURE_TTL seconds and raises
+        LookupError without another request.
+        """
+        key = lat, lon = round(lat, 4), round(lon, 4)
+        retry_at = self._points_failures.get(key)
+        if retry_at is not None:
+            if retry_at > time.monotonic():
+                raise LookupError(f"/points lookup for {lat},{lon} failed recently")
+            del self._points_failures[key]
+        try:
+            return await self._points_cache.get_or_set(
+                key, lambda: self._fetch_points(lat, lon)
+            )
+        except _FETCH_ERRORS:
+            if len(self._points_failures) >= self._points_cache.maxsize:
+                self._points_failures.clear()
+            self._points_failures[key] = time.monotonic() + self.POINTS_FAILURE_TTL
+            raise
+
+    async def _fetch_points(self, lat: float, lon: float) -> Dict[str, Any]:
+        """Fetch the /points properties for a location."""
+        return (await self._get_json(self.POINTS_URL.format(lat, lon)))["properties"]
 
     async def get_forecast(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
         """
         Get forecast for a given latitude and longitude.
         Returns a dictionary with forecast data, or None on error.
         """
-        async with httpx.AsyncClient() as client:
-            # Step 1: Get the forecast office and grid info
-            points_url = f"{self.BASE_URL}/points/{lat},{lon}"
-            try:
-                resp = await client.get(points_url, headers=self.headers, timeout=10)
-                resp.raise_for_status()
-                points_data = resp.json()
-                forecast_url = points_data["properties"]["forecast"]
-            except Exception as e:
-                print(f"[NWS] Error fetching points data: {e}")
-                return None
-            # Step 2: Get the forecast
-            try:
-                resp = await client.get(forecast_url, headers=self.headers, timeout=10)
-                resp.raise_for_status()
-                return resp.json()
-            except Exception as e:
-                print(f"[NWS] Error fetching forecast: {e}")
-                return None
+        # Step 1: Get the forecast office and grid info
+        try:
+            forecast_url = (await self._get_points(lat, lon))["forecast"]
+        except _FETCH_ERRORS as e:
+            logger.error("[NWS] Error fetching points data: %s", e)
+            return None
+        # Step 2: Get the forecast
+        return await self._get_forecast(forecast_url)
+
+    async def get_forecast_summary(
+        self, lat: float, lon: float, fields: Optional[Tuple[str, ...]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a slimmed-down forecast with only the given fields of each period.
+        Defaults to FORECAST_SUMMARY_FIELDS. Returns {"periods": [...]}, or None on error.
+        """
+        forecast = await self.get_forecast(lat, lon)
+        if not forecast:
+            return None
+        fields = fields or self.FORECAST_SUMMARY_FIELDS
+        periods = forecast.get("properties", {}).get("periods", [])
+        return {"periods": [{k: p[k] for k in fields if k in p} for p in periods]}
+
+    async def get_forecasts_bulk(
+        self, coords: List[Tuple[float, float]], concurrency: int = 20
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get forecasts for several locations concurrently.
+        Returns forecasts in the same order as coords; failed lookups are None.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_forecast(lat, lon)
+
+        return await asyncio.gather(*(fetch(lat, lon) for lat, lon in coords))
 
     async def get_current_conditions(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
         """
         Get current weather conditions for a given latitude and longitude.
         Returns a dictionary with observation data, or None on error.
         """
-        async with httpx.AsyncClient() as client:
-            # Step 1: Get the nearest observation station
-            points_url = f"{self.BASE_URL}/points/{lat},{lon}"
-            try:
-                resp = await client.get(points_url, headers=self.headers, timeout=10)
-                resp.raise_for_status()
-                points_data = resp.json()
-                stations_url = points_data["properties"]["observationStations"]
-            except Exception as e:
-                print(f"[NWS] Error fetching observation stations: {e}")
-                return None
-            # Step 2: Get the latest observation from the first station
-            try:
-                resp = await client.get(stations_url, headers=self.headers, timeout=10)
-                resp.raise_for_status()
-                stations_data = resp.json()
-                if not stations_data["features"]:
-                    return None
-                station_id = stations_data["features"][0]["properties"]["stationIdentifier"]
-                obs_url = f"{self.BASE_URL}/stations/{station_id}/observations/latest"
-                resp = await client.get(obs_url, headers=self.headers, timeout=10)
-                resp.raise_for_status()
-                return resp.json()
-            except Exception as e:
-                print(f"[NWS] Error fetching current conditions: {e}")
+        # Step 1: Get the nearest observation station
+        try:
+            stations_url = (await self._get_points(lat, lon))["observationStations"]
+        except _FETCH_ERRORS as e:
+            logger.error("[NWS] Error fetching observation stations: %s", e)
+            return None
+        # Step 2: Get the latest observation from the first station
+        return await self._get_latest_obs(stations_url)
+
+    async def get_all(
+        self, lat: float, lon: float
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Get the forecast and current conditions for a location together.
+        The /points lookup is done once and both follow-up requests run
+        concurrently. Returns (forecast, conditions); either may be None on error.
+        """
+        try:
+            points = await self._get_points(lat, lon)
+            forecast_url = points["forecast"]
+            stations_url = points["observationStations"]
+        except _FETCH_ERRORS as e:
+            logger.error("[NWS] Error fetching points data: %s", e)
+            return None, None
+        forecast, conditions = await asyncio.gather(
+            self._get_forecast(forecast_url),
+            self._get_latest_obs(stations_url),
+        )
+        return forecast, conditions
+
+    async def _get_forecast(self, forecast_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a grid forecast, cached per grid point.
+        Failed fetches are not cached.
+        """
+        return await self._forecast_cache.get_or_set(
+            forecast_url, lambda: self._fetch_forecast(forecast_url)
+        )
+
+    async def _get_latest_obs(self, stations_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest observation for a grid point's stations, cached per grid point.
+        Failed fetches are not cached.
+        """
+        return await self._obs_cache.get_or_set(
+            stations_url, lambda: self._fetch_latest_obs(stations_url)
+        )
+
+    async def _fetch_forecast(self, forecast_url: str) -> Optional[Dict[str, Any]]:
+        """Fetch a grid forecast, or None on error."""
+        try:
+            return await self._get_json(forecast_url)
+        except _FETCH_ERRORS as e:
+            logger.error("[NWS] Error fetching forecast: %s", e)
+            return None
+
+    async def _fetch_latest_obs(self, stations_url: str) -> Optional[Dict[str, Any]]:
+        """Fetch the latest observation from the first listed station, or None on error."""
+        try:
+            # A grid point's nearest station is as stable as the /points metadata
+            station_id = await self._station_cache.get_or_set(
+                stations_url, lambda: self._fetch_station_id(stations_url)
+            )
+            if station_id is None:
                 return None
+            return await self._get_json(self.LATEST_OBS_URL.format(station_id))
+        except _FETCH_ERRORS as e:
+            logger.error("[NWS] Error fetching current conditions: %s", e)
+            return None
+
+    async def _fetch_station_id(self, stations_url: str) -> Optional[str]:
+        """Fetch the identifier of the first listed observation station, or None if there are none."""
+        features = (await self._get_json(stations_url, params={"limit": 1}))["features"]
+        if not features:
+            return None
+        return features[0]["properties"]["stationIdentifier"]
+
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET a URL and decode its JSON body, raising on HTTP errors.
+        Server errors are retried up to MAX_RETRIES times on the same pooled client.
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            resp = await self._client.get(url, params=params, headers=self._request_headers, timeout=10)
+            if resp.status_code < 500 or attempt == self.MAX_RETRIES:
+                break
+            await asyncio.sleep(self.RETRY_BACKOFF * 2 ** attempt)
+        resp.raise_for_status()
+        return orjson.loads(resp.content)
@@ -0,0 +1,73 @@
+"""Async TTL cache with single-flight request coalescing."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class AsyncTTLCache:
+    """Caches the results of coroutines for a fixed time-to-live.
+
+    The in-flight task is cached rather than its result, so concurrent callers
+    asking for the same key share a single call. Calls that raise or return
+    None are not kept, so transient failures are retried on the next request.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 512):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry stays valid
+            maxsize: Maximum number of entries to keep
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, asyncio.Future]]" = OrderedDict()
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value for key, calling factory on a miss.
+
+        Args:
+            key: Hashable cache key
+            factory: Zero-argument callable returning the awaitable to cache
+
+        Returns:
+            The cached or freshly computed value
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            future = entry[1]
+        else:
+            future = asyncio.ensure_future(factory())
+            self._entries[key] = (now + self.ttl, future)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        try:
+            # Shield so one cancelled caller doesn't cancel the shared call
+            result = await asyncio.shield(future)
+        except Exception:
+            self._discard(key, future)
+            raise
+        if result is None:
+            self._discard(key, future)
+        return result
+
+    def _discard(self, key: Hashable, future: Any) -> None:
+        """Drop key if it still maps to the given future."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is future:
+            del self._entries[key]
+
+    def discard(self, key: Hashable) -> None:
+        """Remove key from the cache if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._entries.clear()
@@ -1,32 +1,41 @@
 """LLM utilities for the Beach Information AI Assistant."""
-import os
-from typing import Any, Dict, List, Optional
+import functools
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import litellm
 from litellm import completion, acompletion
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 # Get settings
 settings = get_settings()
 
 # Configure LiteLLM
 litellm.set_verbose = settings.DEBUG
 
-# Set Ollama API base
-os.environ["OLLAMA_API_BASE"] = settings.OLLAMA_API_BASE
-
 
 class LLMClient:
     """LLM client for interacting with the language model."""
     
-    def __init__(self, model: Optional[str] = None):
+    def __init__(self, model: Optional[str] = None, api_base: Optional[str] = None):
         """Initialize the LLM client.
         
         Args:
             model: The model to use. Defaults to the one specified in settings.
+            api_base: The Ollama server URL. Defaults to the one specified in settings.
         """
         self.model = model or settings.OLLAMA_MODEL
+        self.api_base = api_base or settings.OLLAMA_API_BASE
+        # Completion call with the parameters shared by every request bound once
+        self._acompletion = functools.partial(
+            litellm.acompletion,
+            model=f"ollama/{self.model}",
+            api_base=self.api_base,
+            keep_alive=settings.OLLAMA_KEEP_ALIVE,
+        )
     
     async def generate(
         self,
@@ -48,27 +57,60 @@ class LLMClient:
         Returns:
             Any: The full response object from the LLM
         """
+        # Add tools if provided
+        if tools:
+            kwargs["tools"] = tools
+        
         try:
-            # Prepare the parameters
-            params = {
-                "model": f"ollama/{self.model}",
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                **kwargs,
-            }
-            
-            # Add tools if provided
-            if tools:
-                params["tools"] = tools
-                
             # Make the API call and return the full response
-            return await litellm.acompletion(**params)
+            return await self._acompletion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs,
+            )
             
         except Exception as e:
             logger.error(f"Error generating text: {str(e)}", exc_info=True)
             raise
 
+    async def stream_generate(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs,
+    ) -> AsyncIterator[Any]:
+        """Stream completion chunks from the LLM as they are generated.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            temperature: Controls randomness (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
+            tools: Optional list of tool definitions for function calling
+            **kwargs: Additional arguments to pass to the LLM
+            
+        Yields:
+            Any: Streaming chunk objects from the LLM
+        """
+        if tools:
+            kwargs["tools"] = tools
+        
+        try:
+            response = await self._acompletion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **kwargs,
+            )
+            async for chunk in response:
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error streaming text: {str(e)}", exc_info=True)
+            raise
+
 
 # Create a default LLM client
 llm_client = LLMClient()
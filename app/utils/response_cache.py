@@ -0,0 +1,136 @@
+"""In-process cache for LLM responses."""
+import hashlib
+import json
+import math
+import re
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Async callable that turns a user message into an embedding vector
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase text and collapse punctuation and whitespace."""
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    """Cosine similarity between two vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """Caches LLM responses keyed by conversation prefix and user message.
+
+    Entries are grouped under a hash of everything before the latest user
+    message, so a cached answer is only reused for the same conversation state.
+    Within a group, messages match when their normalized text is identical or,
+    if an embedder is configured, when their embeddings are similar enough.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        similarity_threshold: float = 0.95,
+        embedder: Optional[Embedder] = None,
+        max_entries_per_prefix: int = 32,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of conversation prefixes to keep
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            embedder: Optional async function returning an embedding for a message
+            max_entries_per_prefix: Maximum number of answers kept per prefix
+        """
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+        self.max_entries_per_prefix = max_entries_per_prefix
+        self._entries: "OrderedDict[str, List[Tuple[str, Optional[List[float]], str]]]" = OrderedDict()
+        self._last_embedding: Optional[Tuple[str, List[float]]] = None
+
+    @staticmethod
+    def prefix_key(messages: List[Dict[str, Any]]) -> str:
+        """Hash the conversation prefix into a stable key."""
+        payload = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """Embed a message, reusing the most recent embedding when possible."""
+        if self.embedder is None:
+            return None
+        if self._last_embedding and self._last_embedding[0] == text:
+            return self._last_embedding[1]
+        embedding = await self.embedder(text)
+        self._last_embedding = (text, embedding)
+        return embedding
+
+    async def get(self, messages: List[Dict[str, Any]]) -> Optional[str]:
+        """Return a cached response for the conversation, if any.
+
+        Args:
+            messages: Messages about to be sent, ending with the user message
+
+        Returns:
+            The cached response text, or None on a miss
+        """
+        if not messages or messages[-1].get("role") != "user":
+            return None
+        key = self.prefix_key(messages[:-1])
+        candidates = self._entries.get(key)
+        if not candidates:
+            return None
+        self._entries.move_to_end(key)
+
+        text = _normalize(messages[-1].get("content", ""))
+        for cached_text, _, response in candidates:
+            if cached_text == text:
+                return response
+
+        embedding = await self._embed(text)
+        if embedding is None:
+            return None
+        best_score, best_response = 0.0, None
+        for _, cached_embedding, response in candidates:
+            if cached_embedding is None:
+                continue
+            score = _cosine(embedding, cached_embedding)
+            if score > best_score:
+                best_score, best_response = score, response
+        if best_score >= self.similarity_threshold:
+            return best_response
+        return None
+
+    async def set(self, messages: List[Dict[str, Any]], response: str) -> None:
+        """Store the response generated for the conversation.
+
+        Args:
+            messages: Messages that were sent, ending with the user message
+            response: The response text returned by the LLM
+        """
+        if not messages or messages[-1].get("role") != "user":
+            return
+        key = self.prefix_key(messages[:-1])
+        text = _normalize(messages[-1].get("content", ""))
+        embedding = await self._embed(text)
+
+        candidates = self._entries.setdefault(key, [])
+        self._entries.move_to_end(key)
+        # A repeated question replaces its earlier answer rather than adding a duplicate
+        candidates[:] = [entry for entry in candidates if entry[0] != text]
+        candidates.append((text, embedding, response))
+        if len(candidates) > self.max_entries_per_prefix:
+            del candidates[0]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._entries.clear()
+        self._last_embedding = None
@@ -1,123 +1,25 @@
 """Pytest configuration and fixtures."""
+import os
+
+# Keep app startup from calling the LLM; must be set before the settings are loaded
+os.environ.setdefault("LLM_WARMUP", "false")
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
 from app.services.noaa_client import NoaaApiClient
 from app.services.google_places_client import GooglePlacesClient
+from app.services.noaa_nws_client import NoaaNwsClient
 
 
-@pytest.fixture
-def mock_httpx_client():
-    """Create a mock HTTPX client for testing."""
-    return AsyncMock()
-
-
-@pytest.fixture
-def noaa_client(mock_httpx_client):
-    """Create a NOAA API client with a mock HTTPX client."""
-    return NoaaApiClient(client=mock_httpx_client)
-
-
-@pytest.fixture
-def google_places_client(mock_httpx_client):
-    """Create a Google Places API client with a mock HTTPX client."""
-    return GooglePlacesClient(client=mock_httpx_client)
-
-
-@pytest.fixture
-def mock_place_search_response():
-    """Mock response for place search."""
-    return {
-        "results": [
-            {
-                "place_id": "ChIJN1t_tDeuEmsRUsoyG83frY4",
-                "name": "Googleplex",
-                "formatted_address": "1600 Amphitheatre Pkwy, Mountain View, CA 94043, USA",
-                "geometry": {
-                    "location": {
-                        "lat": 37.4223878,
-                        "lng": -122.0841877
-                    },
-                    "viewport": {
-                        "northeast": {
-                            "lat": 37.4239627802915,
-                            "lng": -122.0829089197085
-                        },
-                        "southwest": {
-                            "lat": 37.4212648197085,
-                            "lng": -122.0856068802915
-                        }
-                    }
-                },
-                "business_status": "OPERATIONAL",
-                "rating": 4.6,
-                "user_ratings_total": 1000,
-                "types": ["point_of_interest", "establishment"],
-                "plus_code": {
-                    "compound_code": "CWC8+W9 Mountain View, CA, USA",
-                    "global_code": "849VCWC8+W9"
-                },
-                "photos": [
-                    {
-                        "height": 3024,
-                        "width": 4032,
-                        "photo_reference": "test_photo_reference",
-                        "html_attributions": []
-                    }
-                ]
-            }
-        ],
-        "status": "OK"
-    }
-
-
-@pytest.fixture
-def mock_place_details_response():
-    """Mock response for place details."""
-    return {
-        "result": {
+# Mock payloads are shared by every test that uses them; deep-copy before mutating
+_MOCK_PLACE_SEARCH_RESPONSE = {
+    "results": [
+        {
             "place_id": "ChIJN1t_tDeuEmsRUsoyG83frY4",
             "name": "Googleplex",
             "formatted_address": "1600 Amphitheatre Pkwy, Mountain View, CA 94043, USA",
-            "formatted_phone_number": "(650) 253-0000",
-            "international_phone_number": "+1 650-253-0000",
-            "website": "https://about.google/intl/en/locations/?region=north-america",
-            "rating": 4.6,
-            "user_ratings_total": 1000,
-            "price_level": 3,
-            "types": ["point_of_interest", "establishment"],
-            "opening_hours": {
-                "open_now": True,
-                "periods": [
-                    {
-                        "open": {
-                            "day": 0,
-                            "time": "0900"
-                        },
-                        "close": {
-                            "day": 0,
-                            "time": "1800"
-                        }
-                    }
-                ],
-                "weekday_text": [
-                    "Monday: 9:00 AM – 6:00 PM",
-                    "Tuesday: 9:00 AM – 6:00 PM",
-                    "Wednesday: 9:00 AM – 6:00 PM",
-                    "Thursday: 9:00 AM – 6:00 PM",
-                    "Friday: 9:00 AM – 6:00 PM",
-                    "Saturday: Closed",
-                    "Sunday: Closed"
-                ]
-            },
-            "photos": [
-                {
-                    "height": 3024,
-                    "width": 4032,
-                    "photo_reference": "test_photo_reference",
-                    "html_attributions": []
-                }
-            ],
             "geometry": {
                 "location": {
                     "lat": 37.4223878,
@@ -135,19 +37,208 @@ def mock_place_details_response():
                 }
             },
             "business_status": "OPERATIONAL",
-            "vicinity": "1600 Amphitheatre Parkway, Mountain View",
-            "url": "https://maps.google.com/?cid=10289066590918843342",
-            "utc_offset": -420,
-            "adr_address": "<span class=\"street-address\">1600 Amphitheatre Pkwy</span>, <span class=\"locality\">Mountain View</span>, <span class=\"region\">CA</span> <span class=\"postal-code\">94043</span>, <span class=\"country-name\">USA</span>",
+            "rating": 4.6,
+            "user_ratings_total": 1000,
+            "types": ["point_of_interest", "establishment"],
             "plus_code": {
                 "compound_code": "CWC8+W9 Mountain View, CA, USA",
                 "global_code": "849VCWC8+W9"
             },
-            "reference": "ChIJN1t_tDeuEmsRUsoyG83frY4",
-            "scope": "GOOGLE"
+            "photos": [
+                {
+                    "height": 3024,
+                    "width": 4032,
+                    "photo_reference": "test_photo_reference",
+                    "html_attributions": []
+                }
+            ]
+        }
+    ],
+    "status": "OK"
+}
+
+
+_MOCK_PLACE_DETAILS_RESPONSE = {
+    "result": {
+        "place_id": "ChIJN1t_tDeuEmsRUsoyG83frY4",
+        "name": "Googleplex",
+        "formatted_address": "1600 Amphitheatre Pkwy, Mountain View, CA 94043, USA",
+        "formatted_phone_number": "(650) 253-0000",
+        "international_phone_number": "+1 650-253-0000",
+        "website": "https://about.google/intl/en/locations/?region=north-america",
+        "rating": 4.6,
+        "user_ratings_total": 1000,
+        "price_level": 3,
+        "types": ["point_of_interest", "establishment"],
+        "opening_hours": {
+            "open_now": True,
+            "periods": [
+                {
+                    "open": {
+                        "day": 0,
+                        "time": "0900"
+                    },
+                    "close": {
+                        "day": 0,
+                        "time": "1800"
+                    }
+                }
+            ],
+            "weekday_text": [
+                "Monday: 9:00 AM – 6:00 PM",
+                "Tuesday: 9:00 AM – 6:00 PM",
+                "Wednesday: 9:00 AM – 6:00 PM",
+                "Thursday: 9:00 AM – 6:00 PM",
+                "Friday: 9:00 AM – 6:00 PM",
+                "Saturday: Closed",
+                "Sunday: Closed"
+            ]
+        },
+        "photos": [
+            {
+                "height": 3024,
+                "width": 4032,
+                "photo_reference": "test_photo_reference",
+                "html_attributions": []
+            }
+        ],
+        "geometry": {
+            "location": {
+                "lat": 37.4223878,
+                "lng": -122.0841877
+            },
+            "viewport": {
+                "northeast": {
+                    "lat": 37.4239627802915,
+                    "lng": -122.0829089197085
+                },
+                "southwest": {
+                    "lat": 37.4212648197085,
+                    "lng": -122.0856068802915
+                }
+            }
+        },
+        "business_status": "OPERATIONAL",
+        "vicinity": "1600 Amphitheatre Parkway, Mountain View",
+        "url": "https://maps.google.com/?cid=10289066590918843342",
+        "utc_offset": -420,
+        "adr_address": "<span class=\"street-address\">1600 Amphitheatre Pkwy</span>, <span class=\"locality\">Mountain View</span>, <span class=\"region\">CA</span> <span class=\"postal-code\">94043</span>, <span class=\"country-name\">USA</span>",
+        "plus_code": {
+            "compound_code": "CWC8+W9 Mountain View, CA, USA",
+            "global_code": "849VCWC8+W9"
         },
-        "status": "OK"
-    }
+        "reference": "ChIJN1t_tDeuEmsRUsoyG83frY4",
+        "scope": "GOOGLE"
+    },
+    "status": "OK"
+}
+
+
+@pytest.fixture
+def mock_httpx_client():
+    """Create a mock HTTPX client for testing.
+
+    The spec rejects attributes httpx.AsyncClient doesn't have; its async
+    methods (request, aclose, ...) are mocked as AsyncMocks.
+    """
+    client = MagicMock(spec=httpx.AsyncClient)
+    client.request = AsyncMock()
+    return client
+
+
+@pytest.fixture
+def noaa_client(mock_httpx_client):
+    """Create a NOAA API client with a mock HTTPX client."""
+    return NoaaApiClient(client=mock_httpx_client)
+
+
+@pytest.fixture(scope="session")
+def shared_nws_routes():
+    """Route table behind the shared NWS client's transport."""
+    return {}
+
+
+@pytest.fixture(scope="session")
+async def shared_nws_client(shared_nws_routes):
+    """Create one NWS client for the whole test session, backed by an in-memory transport."""
+    def handler(request):
+        route = shared_nws_routes.get(request.url.path)
+        if route is None:
+            return httpx.Response(404)
+        if callable(route):
+            return route(request)
+        if isinstance(route, bytes):
+            return httpx.Response(200, content=route, headers={"Content-Type": "application/geo+json"})
+        return httpx.Response(200, json=route)
+
+    async with NoaaNwsClient(transport=httpx.MockTransport(handler)) as client:
+        yield client
+
+
+@pytest.fixture
+def nws_routes(shared_nws_routes):
+    """Mock NWS responses keyed by URL path, e.g. "/points/26.2379,-80.1248".
+
+    Values are JSON bodies (dict), pre-encoded JSON bodies (bytes), or handlers
+    that take the request and return an httpx.Response. Unrouted paths get a 404.
+    """
+    shared_nws_routes.clear()
+    return shared_nws_routes
+
+
+@pytest.fixture
+def nws_client(shared_nws_client, nws_routes):
+    """The shared NWS client with its caches and routes emptied for the current test."""
+    shared_nws_client.clear_cache()
+    return shared_nws_client
+
+
+@pytest.fixture
+def places_routes():
+    """Mock Google Places responses keyed by endpoint, e.g. "/details/json".
+
+    Values are JSON bodies (dict), raw bodies (bytes), or handlers that take
+    the request and return an httpx.Response (optionally from a coroutine).
+    """
+    return {}
+
+
+@pytest.fixture
+def places_requests():
+    """Requests received by the mock Google Places API, in order."""
+    return []
+
+
+@pytest.fixture
+async def google_places_client(places_routes, places_requests):
+    """Create a Google Places API client backed by an in-memory transport."""
+    prefix = httpx.URL(GooglePlacesClient.BASE_URL).path
+
+    def handler(request):
+        places_requests.append(request)
+        route = places_routes[request.url.path[len(prefix):]]
+        if callable(route):
+            return route(request)
+        if isinstance(route, bytes):
+            return httpx.Response(200, content=route)
+        return httpx.Response(200, json=route)
+
+    async with httpx.AsyncClient(
+        base_url=GooglePlacesClient.BASE_URL, transport=httpx.MockTransport(handler)
+    ) as http_client:
+        yield GooglePlacesClient(client=http_client)
+
+
+@pytest.fixture(scope="session")
+def mock_place_search_response():
+    """Mock response for place search."""
+    return _MOCK_PLACE_SEARCH_RESPONSE
+
+
+@pytest.fixture(scope="session")
+def mock_place_details_response():
+    """Mock response for place details."""
+    return _MOCK_PLACE_DETAILS_RESPONSE
 
 
 @pytest.fixture
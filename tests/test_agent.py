@@ -1,40 +1,39 @@
 """Test cases for the BeachAgent."""
 import pytest
 import asyncio
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 
-# Enable asyncio support for pytest
-pytestmark = pytest.mark.asyncio
-
 from app.agent import BeachAgent, Tool, Message
+from app.agent import beach_agent as beach_agent_module
+from app.agent.beach_agent import FEW_SHOT_EXAMPLES, _extract_text
 
 # Sample tool for testing
 async def mock_weather_tool(location: str) -> dict:
     """Mock weather tool for testing."""
     return {"location": location, "temperature": 75, "conditions": "sunny"}
 
+# Tools are immutable, so one instance is shared by every agent
+WEATHER_TOOL = Tool(
+    name="get_weather",
+    description="Get the current weather for a location",
+    parameters={
+        "type": "object",
+        "properties": {
+            "location": {"type": "string", "description": "The city and state, e.g., San Francisco, CA"}
+        },
+        "required": ["location"]
+    },
+    function=mock_weather_tool
+)
+
 @pytest.fixture
 def beach_agent():
     """Create a test BeachAgent instance."""
-    # Create a test tool
-    weather_tool = Tool(
-        name="get_weather",
-        description="Get the current weather for a location",
-        parameters={
-            "type": "object",
-            "properties": {
-                "location": {"type": "string", "description": "The city and state, e.g., San Francisco, CA"}
-            },
-            "required": ["location"]
-        },
-        function=mock_weather_tool
-    )
-    
     # Create agent with the test tool
-    agent = BeachAgent(tools=[weather_tool])
+    agent = BeachAgent(tools=[WEATHER_TOOL])
     return agent
 
-@pytest.mark.asyncio
 async def test_agent_initialization(beach_agent):
     """Test that the agent initializes correctly."""
     assert beach_agent is not None
@@ -45,7 +44,6 @@ async def test_agent_initialization(beach_agent):
     assert history[0]["role"] == "system"
 
 
-@pytest.mark.asyncio
 async def test_agent_response(beach_agent):
     """Test that the agent can respond to a message."""
     response = await beach_agent.process_message("Hello, can you tell me about Santa Monica beach?")
@@ -62,14 +60,12 @@ async def test_agent_response(beach_agent):
     assert history[-1]["role"] == "assistant"
 
 
-@pytest.mark.asyncio
 async def test_agent_with_tools(beach_agent):
     """Test that the agent can use tools."""
     # This test is more complex as it requires the LLM to decide to use the tool
     # For now, we'll just test that the tool is available
     assert "get_weather" in [tool.name for tool in beach_agent.tools.values()]
 
-@pytest.mark.asyncio
 async def test_agent_clear_memory(beach_agent):
     """Test that clearing the agent's memory works."""
     # Add some messages
@@ -79,7 +75,473 @@ async def test_agent_clear_memory(beach_agent):
     # Clear memory
     beach_agent.clear_memory()
     
-    # Check that only the system message remains
+    # Check that only the system message and few-shot examples remain
     history = beach_agent.get_conversation_history()
-    assert len(history) == 1  # Just system message
+    assert len(history) == 1 + len(FEW_SHOT_EXAMPLES)
     assert history[0]["role"] == "system"
+    assert history[1:] == FEW_SHOT_EXAMPLES
+
+
+def _make_tool_call(call_id: str, name: str, arguments: str):
+    """Build a minimal LiteLLM-style tool call object."""
+    return SimpleNamespace(
+        id=call_id,
+        function=SimpleNamespace(name=name, arguments=arguments)
+    )
+
+
+def _completion(content, tool_calls=None):
+    """Build a minimal LiteLLM-style chat completion."""
+    return SimpleNamespace(choices=[SimpleNamespace(
+        message=SimpleNamespace(content=content, tool_calls=tool_calls)
+    )])
+
+
+async def test_handle_tool_calls_runs_concurrently(beach_agent):
+    """Test that multiple tool calls are dispatched concurrently and keep their order."""
+    started = []
+    release = asyncio.Event()
+
+    async def slow_tool(location: str) -> dict:
+        started.append(location)
+        if len(started) == 2:
+            release.set()
+        # Both calls must be in flight before either can finish
+        await asyncio.wait_for(release.wait(), timeout=1)
+        return {"location": location}
+
+    def sync_tool(location: str) -> dict:
+        raise ValueError(f"no data for {location}")
+
+    beach_agent.add_tool(Tool(name="slow", description="slow", parameters={}, function=slow_tool))
+    beach_agent.add_tool(Tool(name="broken", description="broken", parameters={}, function=sync_tool))
+
+    responses = await beach_agent._handle_tool_calls([
+        _make_tool_call("1", "slow", '{"location": "Venice"}'),
+        _make_tool_call("2", "missing", '{}'),
+        _make_tool_call("3", "broken", '{"location": "Miami"}'),
+        _make_tool_call("4", "slow", '{"location": "Malibu"}'),
+    ])
+
+    assert [r.tool_call_id for r in responses] == ["1", "3", "4"]
+    assert responses[0].content == '{"location":"Venice"}'
+    assert responses[1].content == "Error: no data for Miami"
+    assert responses[2].content == '{"location":"Malibu"}'
+
+
+async def test_tools_payload_is_cached(beach_agent):
+    """Test that tool schemas are serialized once and refreshed by add_tool."""
+    first = beach_agent._tools_payload
+    assert [t["name"] for t in first] == ["get_weather"]
+
+    beach_agent.add_tool(Tool(name="get_tides", description="tides", parameters={}, function=mock_weather_tool))
+    names = [t["name"] for t in beach_agent._tools_payload]
+    assert names == ["get_weather", "get_tides"]
+
+
+async def test_prepare_messages_keeps_history_unchanged(beach_agent, monkeypatch):
+    """Test that tools are passed to the LLM separately rather than spliced into a message."""
+
+    messages = beach_agent._prepare_messages()
+    assert all("tools" not in m for m in messages)
+    assert messages == beach_agent.get_conversation_history()
+
+    response = _completion("ok")
+    generate = AsyncMock(return_value=response)
+    monkeypatch.setattr(beach_agent_module.llm_client, "generate", generate)
+    await beach_agent._get_llm_response(messages)
+    assert generate.await_args.kwargs["tools"] is beach_agent._tools_payload
+
+def test_conversation_memory_evicts_oldest():
+    """Test that ConversationMemory keeps only the most recent messages."""
+    from app.agent import ConversationMemory
+    memory = ConversationMemory(max_messages=3)
+    for i in range(5):
+        memory.add_message(Message(role="user", content=f"message {i}"))
+
+    assert [m["content"] for m in memory.get_messages()] == ["message 2", "message 3", "message 4"]
+    memory.clear()
+    assert memory.get_messages() == []
+
+
+def test_conversation_memory_pins_prefix():
+    """Test that the pinned prefix is never evicted or cleared."""
+    from app.agent import ConversationMemory
+    memory = ConversationMemory(max_messages=2)
+    memory.set_prefix([Message(role="system", content="prompt")])
+    for i in range(4):
+        memory.add_message(Message(role="user", content=f"message {i}"))
+    assert [m["content"] for m in memory.get_messages()] == ["prompt", "message 2", "message 3"]
+    memory.clear()
+    assert memory.get_messages() == [{"role": "system", "content": "prompt"}]
+
+
+def test_conversation_memory_serializes_once():
+    """Test that messages are dumped once on insert rather than on every read."""
+    from app.agent import ConversationMemory
+    memory = ConversationMemory(max_messages=5)
+    memory.add_message(Message(role="user", content="hi"))
+
+    first = memory.get_messages()
+    second = memory.get_messages()
+    assert first == [{"role": "user", "content": "hi"}]
+    assert first[0] is second[0]
+
+
+async def test_get_llm_response_returns_text_without_tool_calls(beach_agent, monkeypatch):
+    """Test that a plain completion is unwrapped to its text content."""
+
+    response = _completion("Sunny all day.")
+    monkeypatch.setattr(beach_agent_module.llm_client, "generate", AsyncMock(return_value=response))
+
+    result = await beach_agent._get_llm_response(beach_agent._prepare_messages())
+    assert result == "Sunny all day."
+
+
+async def test_tool_calls_respect_concurrency_limit(beach_agent):
+    """Test that tool invocations never exceed the configured concurrency."""
+    in_flight = 0
+    peak = 0
+
+    async def tracked_tool(location: str) -> dict:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"location": location}
+
+    beach_agent._tool_sem = asyncio.Semaphore(2)
+    beach_agent.add_tool(Tool(name="tracked", description="tracked", parameters={}, function=tracked_tool))
+
+    responses = await beach_agent._handle_tool_calls([
+        _make_tool_call(str(i), "tracked", '{"location": "Venice"}') for i in range(6)
+    ])
+
+    assert len(responses) == 6
+    assert peak == 2
+
+
+def test_message_is_immutable():
+    """Test that committed messages cannot be modified after construction."""
+    from pydantic import ValidationError
+    message = Message(role="user", content="hi")
+    with pytest.raises(ValidationError):
+        message.content = "changed"
+    with pytest.raises(ValidationError):
+        Message(role="user", content="hi", unexpected="field")
+
+
+async def test_get_llm_response_uses_response_cache(beach_agent, monkeypatch):
+    """Test that a repeated question for the same conversation skips the LLM."""
+
+    response = _completion("Sunny all day.")
+    generate = AsyncMock(return_value=response)
+    monkeypatch.setattr(beach_agent_module.llm_client, "generate", generate)
+
+    messages = [*beach_agent._prepare_messages(), {"role": "user", "content": "Weather at Venice?"}]
+    assert await beach_agent._get_llm_response(list(messages)) == "Sunny all day."
+    assert await beach_agent._get_llm_response(list(messages)) == "Sunny all day."
+    generate.assert_awaited_once()
+
+
+async def test_stream_message_yields_llm_chunks(beach_agent, monkeypatch):
+    """Test that LLM output is streamed and committed to memory once complete."""
+
+    async def fake_stream(**kwargs):
+        for text in ["Venice is ", "great ", None, "for surfing."]:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    async def no_sources(message):
+        return None
+
+    monkeypatch.setattr(beach_agent_module.llm_client, "stream_generate", fake_stream)
+    monkeypatch.setattr(beach_agent, "_answer_from_sources", no_sources)
+
+    chunks = [chunk async for chunk in beach_agent.stream_message("Tell me about Venice")]
+
+    assert chunks == ["Venice is ", "great ", "for surfing."]
+    history = beach_agent.get_conversation_history()
+    assert history[-2] == {"role": "user", "content": "Tell me about Venice"}
+    assert history[-1] == {"role": "assistant", "content": "Venice is great for surfing."}
+
+
+async def test_stream_message_failure_leaves_memory_untouched(beach_agent, monkeypatch):
+    """Test that a stream failing mid-answer records nothing and adds no error text."""
+
+    async def failing_stream(**kwargs):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Venice is "))])
+        raise RuntimeError("connection dropped")
+
+    async def no_sources(message):
+        return None
+
+    monkeypatch.setattr(beach_agent_module.llm_client, "stream_generate", failing_stream)
+    monkeypatch.setattr(beach_agent, "_answer_from_sources", no_sources)
+    history = beach_agent.get_conversation_history()
+
+    chunks = [chunk async for chunk in beach_agent.stream_message("Tell me about Venice")]
+
+    assert chunks == ["Venice is "]
+    assert beach_agent.get_conversation_history() == history
+
+
+async def test_stream_message_releases_llm_slot_before_consumer_finishes(beach_agent, monkeypatch):
+    """Test that a slow consumer does not hold the LLM semaphore, and an abort records nothing."""
+
+    async def fake_stream(**kwargs):
+        for text in ["Venice ", "is ", "great."]:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    async def no_sources(message):
+        return None
+
+    monkeypatch.setattr(beach_agent_module.llm_client, "stream_generate", fake_stream)
+    monkeypatch.setattr(beach_agent, "_answer_from_sources", no_sources)
+    beach_agent.response_cache = None
+    history = beach_agent.get_conversation_history()
+    free_slots = beach_agent._llm_sem._value
+
+    stream = beach_agent.stream_message("Tell me about Venice")
+    assert await anext(stream) == "Venice "
+    await asyncio.sleep(0)
+    assert beach_agent._llm_sem._value == free_slots
+    await stream.aclose()
+
+    assert beach_agent.get_conversation_history() == history
+
+
+def test_message_as_dict_matches_model_dump():
+    """Test that the hand-written serializer matches pydantic's output."""
+    messages = [
+        Message(role="user", content="hi"),
+        Message(role="tool", content="{}", name="get_weather", tool_call_id="call_1"),
+        Message(role="tool", content="", name=""),
+    ]
+    for message in messages:
+        assert message.as_dict() == message.model_dump(exclude_none=True)
+
+
+def test_prepare_messages_reuses_cached_dicts(beach_agent):
+    """Test that preparing messages does not copy or rewrite any message dict."""
+    memory_dicts = beach_agent.memory._prefix_dumped + list(beach_agent.memory._dumped)
+    prepared = beach_agent._prepare_messages()
+    assert len(prepared) == len(memory_dicts)
+    assert all(a is b for a, b in zip(prepared, memory_dicts))
+
+
+async def test_tool_dispatch_awaits_async_callables_and_threads_sync(beach_agent):
+    """Test that async callables are awaited and sync functions run off the event loop."""
+    import threading
+
+    class AsyncLookup:
+        async def __call__(self, location: str) -> dict:
+            return {"location": location}
+
+    def blocking_lookup(location: str) -> dict:
+        return {"thread": threading.current_thread() is threading.main_thread()}
+
+    beach_agent.add_tool(Tool(name="async_obj", description="", parameters={}, function=AsyncLookup()))
+    beach_agent.add_tool(Tool(name="blocking", description="", parameters={}, function=blocking_lookup))
+
+    responses = await beach_agent._handle_tool_calls([
+        _make_tool_call("1", "async_obj", '{"location": "Venice"}'),
+        _make_tool_call("2", "blocking", '{"location": "Venice"}'),
+    ])
+
+    assert responses[0].content == '{"location":"Venice"}'
+    assert responses[1].content == '{"thread":false}'
+
+
+def test_extract_text_handles_response_shapes():
+    """Test that response text extraction falls back cleanly."""
+    assert _extract_text(_completion("Sunny.")) == "Sunny."
+    assert _extract_text(_completion(None)) == "I don't have a response for that."
+    assert _extract_text(SimpleNamespace(choices=[])) == "I don't have a response for that."
+    assert _extract_text(object()) == "I don't have a response for that."
+    assert _extract_text("Plain text") == "Plain text"
+    assert _extract_text(None) == "I don't have a response for that."
+
+
+async def test_process_batch_packs_questions_into_one_llm_call(beach_agent, monkeypatch):
+    """Test that LLM-bound questions are answered from a single batched call."""
+
+    async def sources(message):
+        return "High tide at 2 PM" if "tide" in message.lower() else None
+
+    response = _completion('{"answers": ["surfing is great", "bring sunscreen"]}')
+    generate = AsyncMock(return_value=response)
+    monkeypatch.setattr(beach_agent_module.llm_client, "generate", generate)
+    monkeypatch.setattr(beach_agent, "_answer_from_sources", sources)
+    beach_agent.memory.add_message(Message(role="user", content="Another caller's question"))
+
+    results = await beach_agent.process_batch(["Surfing in Venice?", "Tide at Venice?", "What to pack?"])
+
+    assert results == ["Surfing is great.", "High tide at 2 PM.", "Bring sunscreen."]
+    generate.assert_awaited_once()
+    messages = generate.await_args.kwargs["messages"]
+    assert messages[:-1] == beach_agent.memory.get_prefix_messages()
+    assert "1. Surfing in Venice?\n2. What to pack?" in messages[-1]["content"]
+
+
+def test_extract_beach_name_regex_fallback(monkeypatch):
+    """Test beach extraction when no spaCy pipeline is available."""
+    monkeypatch.setattr(beach_agent_module, "_get_nlp", lambda: None)
+    extract = beach_agent_module._extract_beach_name
+
+    assert extract("Tides near santa monica beach?") == "Santa Monica Beach"
+    assert extract("Venice Beach weather") == "Venice Beach"
+    assert extract("Tell me about Clearwater") == "Clearwater"
+    assert extract("   ") is None
+
+
+def test_extract_beach_name_matches_known_beaches_without_nlp(monkeypatch):
+    """Test that known beaches are resolved by the dictionary matcher before NER runs."""
+
+    def fail():
+        raise AssertionError("NER should not run for known beaches")
+
+    monkeypatch.setattr(beach_agent_module, "_get_nlp", fail)
+    extract = beach_agent_module._extract_beach_name
+
+    assert extract("What is the tide at Santa Monica today?") == "Santa Monica Beach"
+    assert extract("weather at FORT LAUDERDALE beach") == "Fort Lauderdale Beach"
+    assert extract("Is Venice Beach crowded?") == "Venice Beach"
+
+
+async def test_live_tide_info_resolves_station_from_extracted_name():
+    """Test that an extracted "X Beach" name finds the station keyed by short name."""
+    noaa_client = SimpleNamespace(get_tide_predictions=AsyncMock(return_value=[]))
+    agent = BeachAgent(noaa_client=noaa_client)
+
+    result = await agent._get_live_tide_info("Santa Monica Beach")
+
+    assert result == "No tide predictions available for Santa Monica Beach (NOAA)."
+    assert noaa_client.get_tide_predictions.await_args.kwargs["station_id"] == "9410840"
+
+
+async def test_live_tide_info_reports_first_high_and_low():
+    """Test that the first high and low predictions are formatted."""
+    from app.models.noaa_models import NoaaTidePrediction
+    predictions = [
+        NoaaTidePrediction(t="2024-02-29 03:12", v="0.4", type="L"),
+        NoaaTidePrediction(t="2024-02-29 09:45", v="5.1", type="H"),
+        NoaaTidePrediction(t="2024-02-29 15:30", v="-0.2", type="L"),
+    ]
+    noaa_client = SimpleNamespace(get_tide_predictions=AsyncMock(return_value=predictions))
+    agent = BeachAgent(noaa_client=noaa_client)
+
+    result = await agent._get_live_tide_info("Venice Beach")
+
+    assert "high tide at Venice Beach is H at 09:45 AM (5.1 ft)" in result
+    assert "low tide is L at 03:12 AM (0.4 ft)" in result
+
+
+async def test_warmup_sends_pinned_prefix(beach_agent, monkeypatch):
+    """Test that warmup prefills only the system prompt and few-shot prefix."""
+    generate = AsyncMock(return_value=None)
+    monkeypatch.setattr(beach_agent_module.llm_client, "generate", generate)
+    await beach_agent.process_message("How is the surf?")
+
+    generate.reset_mock()
+    assert await beach_agent.warmup() is True
+    messages = generate.await_args.kwargs["messages"]
+    assert messages[:-1] == beach_agent.memory.get_prefix_messages()
+    assert messages[-1]["role"] == "user"
+    assert generate.await_args.kwargs["max_tokens"] == 1
+
+    generate.side_effect = RuntimeError("backend down")
+    assert await beach_agent.warmup() is False
+
+
+def test_tide_date_range_spans_month_end():
+    """Test that the tide date range covers the given day and the next."""
+    from datetime import date
+    from app.agent.beach_agent import _tide_date_range
+
+    assert _tide_date_range(date(2024, 2, 29).toordinal()) == ("20240229", "20240301")
+
+
+async def test_answer_from_sources_detects_intents_by_keyword(beach_agent):
+    """Test that tokenized keyword matching routes to the right data source."""
+
+    places = SimpleNamespace(results=[SimpleNamespace(name="Cafe Del Mar")])
+    beach_agent.google_places_client = SimpleNamespace(search_places=AsyncMock(return_value=places))
+
+    response = await beach_agent._answer_from_sources("Any restaurants near Venice Beach?")
+    assert "Cafe Del Mar" in response
+    assert await beach_agent._answer_from_sources("Tell me a joke about Venice Beach") is None
+
+
+@pytest.mark.parametrize("message, keywords", [
+    ("Any riptide warnings today?", "_TIDE_KW"),
+    ("Is it good for windsurfing?", "_WEATHER_KW"),
+    ("Can I windsurf this afternoon?", "_WEATHER_KW"),
+    ("Will there be thunderstorms?", "_WEATHER_KW"),
+])
+def test_intent_keywords_cover_compound_words(message, keywords):
+    """Test that compound words the old substring checks matched still route to a source."""
+
+    tokens = set(beach_agent_module._TOKEN_RE.findall(message.lower()))
+    assert not tokens.isdisjoint(getattr(beach_agent_module, keywords))
+
+
+async def test_answer_from_sources_fetches_tides_and_amenities_concurrently(beach_agent, monkeypatch):
+    """Test that combined questions overlap their source calls and isolate failures."""
+
+    both_started = asyncio.Event()
+    started = []
+
+    async def tide_info(beach):
+        started.append("tide")
+        if len(started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+        return "High tide at 2 PM"
+
+    async def search_places(query):
+        started.append("places")
+        if len(started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+        raise RuntimeError("quota exceeded")
+
+    beach_agent.noaa_client = SimpleNamespace()
+    beach_agent.google_places_client = SimpleNamespace(search_places=search_places)
+    monkeypatch.setattr(beach_agent, "_get_live_tide_info", tide_info)
+
+    response = await beach_agent._answer_from_sources("Tides and parking at Venice Beach?")
+
+    assert "**Tide Information:**\nHigh tide at 2 PM" in response
+    assert "**Amenities:**\nSorry, there was an error fetching amenities" in response
+
+
+def test_format_response_extracts_first_assistant_answer(beach_agent):
+    """Test that transcripts are trimmed to the first assistant answer."""
+    transcript = "### User:\nHi\n### Assistant:\nthe tide is high\n### User:\nThanks"
+    assert beach_agent.format_response(transcript) == "The tide is high."
+    assert beach_agent.format_response("") == "I'm sorry, I couldn't find the information you requested."
+
+
+def test_format_response_keeps_already_formatted_text(beach_agent):
+    """Test that capitalization and punctuation are only added when missing."""
+    text = "Surf's up at Venice Beach!"
+    assert beach_agent.format_response(text) is text
+    assert beach_agent.format_response("42 lifeguard towers") == "42 lifeguard towers."
+    assert beach_agent.format_response('They said "bring sunscreen"') == 'They said "bring sunscreen"'
+
+
+async def test_prompt_length_is_bounded_by_recent_window(beach_agent, monkeypatch):
+    """Test that only the pinned prefix and the most recent turns are sent."""
+    generate = AsyncMock(return_value="Sure.")
+    monkeypatch.setattr(beach_agent_module.llm_client, "generate", generate)
+    beach_agent.response_cache = None
+
+    for i in range(10):
+        await beach_agent.process_message(f"Question {i}?")
+
+    messages = generate.await_args.kwargs["messages"]
+    prefix = beach_agent.memory.get_prefix_messages()
+    assert messages[:len(prefix)] == prefix
+    assert len(messages) == len(prefix) + beach_agent.memory.max_messages
+    assert messages[-1] == {"role": "user", "content": "Question 9?"}
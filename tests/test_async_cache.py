@@ -0,0 +1,85 @@
+"""Tests for the async TTL cache."""
+import asyncio
+
+import pytest
+
+from app.utils.async_cache import AsyncTTLCache
+
+
+async def test_concurrent_misses_share_one_call():
+    """Test that concurrent requests for the same key run the factory once."""
+    cache = AsyncTTLCache(ttl=60)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"tide": "high"}
+
+    results = await asyncio.gather(*(cache.get_or_set("key", fetch) for _ in range(5)))
+
+    assert calls == 1
+    assert all(r == {"tide": "high"} for r in results)
+    assert await cache.get_or_set("key", fetch) == {"tide": "high"}
+    assert calls == 1
+
+
+async def test_expired_entries_are_refreshed():
+    """Test that entries past their TTL trigger a new call."""
+    cache = AsyncTTLCache(ttl=0)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await cache.get_or_set("key", fetch) == 1
+    assert await cache.get_or_set("key", fetch) == 2
+
+
+async def test_errors_and_none_are_not_cached():
+    """Test that failed or empty results are retried next time."""
+    cache = AsyncTTLCache(ttl=60)
+    outcomes = [RuntimeError("down"), None, "ok"]
+
+    async def fetch():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_set("key", fetch)
+    assert await cache.get_or_set("key", fetch) is None
+    assert await cache.get_or_set("key", fetch) == "ok"
+    assert await cache.get_or_set("key", fetch) == "ok"
+
+
+async def test_maxsize_evicts_oldest():
+    """Test that the cache stays within maxsize."""
+    cache = AsyncTTLCache(ttl=60, maxsize=2)
+
+    async def value(v):
+        return v
+
+    for key in ["a", "b", "c"]:
+        await cache.get_or_set(key, lambda k=key: value(k))
+
+    assert list(cache._entries) == ["b", "c"]
+
+
+async def test_discard_forces_refetch():
+    """Test that a discarded key is fetched again."""
+    cache = AsyncTTLCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get_or_set("key", fetch) == 1
+    cache.discard("key")
+    cache.discard("missing")
+    assert await cache.get_or_set("key", fetch) == 2
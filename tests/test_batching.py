@@ -0,0 +1,67 @@
+"""Tests for the request micro-batcher."""
+import asyncio
+
+import pytest
+
+from app.utils.batching import RequestBatcher
+
+
+async def test_concurrent_submissions_share_a_batch():
+    """Test that items submitted together reach the handler as one batch."""
+    batches = []
+
+    async def handler(items):
+        batches.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = RequestBatcher(handler, max_batch_size=8, max_wait=0.05)
+    results = await asyncio.gather(*(batcher.submit(x) for x in ["a", "b", "c"]))
+    await batcher.close()
+
+    assert results == ["A", "B", "C"]
+    assert batches == [["a", "b", "c"]]
+
+
+async def test_batches_are_capped_at_max_size():
+    """Test that a burst larger than max_batch_size is split."""
+    batches = []
+
+    async def handler(items):
+        batches.append(len(items))
+        return items
+
+    batcher = RequestBatcher(handler, max_batch_size=2, max_wait=0.05)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+    await batcher.close()
+
+    assert results == [0, 1, 2, 3, 4]
+    assert batches == [2, 2, 1]
+
+
+async def test_handler_errors_propagate_to_callers():
+    """Test that a failing batch raises in every waiting caller."""
+    async def handler(items):
+        raise RuntimeError("backend down")
+
+    batcher = RequestBatcher(handler, max_wait=0.01)
+    with pytest.raises(RuntimeError, match="backend down"):
+        await batcher.submit("a")
+    await batcher.close()
+
+
+async def test_close_cancels_pending_submissions():
+    """Test that callers waiting at shutdown are cancelled instead of hanging."""
+    started = asyncio.Event()
+
+    async def handler(items):
+        started.set()
+        await asyncio.Event().wait()
+
+    batcher = RequestBatcher(handler, max_batch_size=1, max_wait=0.01)
+    submissions = [asyncio.create_task(batcher.submit(x)) for x in ["a", "b", "c"]]
+    await started.wait()
+    await batcher.close()
+
+    results = await asyncio.wait_for(asyncio.gather(*submissions, return_exceptions=True), timeout=1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert not batcher._inflight
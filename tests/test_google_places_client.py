@@ -1,24 +1,20 @@
 """Tests for the Google Places API client."""
+import copy
+
+import httpx
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from datetime import datetime
 
 from app.models.google_places_models import Place, PlaceSearchResponse, PlaceSearchResult
 
 
-@pytest.mark.asyncio
 async def test_search_places(
     google_places_client,
-    mock_httpx_client,
+    places_routes,
+    places_requests,
     mock_place_search_response
 ):
     """Test searching for places."""
-    # Setup mock response
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = mock_place_search_response
-    mock_response.raise_for_status = AsyncMock()
-    mock_httpx_client.request.return_value = mock_response
+    places_routes["/textsearch/json"] = mock_place_search_response
     
     # Call the method
     response = await google_places_client.search_places(
@@ -29,49 +25,33 @@ async def test_search_places(
     )
     
     # Verify the request was made correctly
-    mock_httpx_client.request.assert_awaited_once()
-    call_args = mock_httpx_client.request.await_args
+    assert len(places_requests) == 1
+    request = places_requests[0]
     
     # Check the request parameters
-    assert call_args.kwargs["method"] == "GET"
-    assert call_args.kwargs["url"] == "/textsearch/json"
-    assert call_args.kwargs["params"]["query"] == "Googleplex"
-    assert call_args.kwargs["params"]["location"] == "37.4223878,-122.0841877"
-    assert call_args.kwargs["params"]["radius"] == 5000
-    assert call_args.kwargs["params"]["type"] == "point_of_interest"
+    assert request.method == "GET"
+    assert request.url.path.endswith("/textsearch/json")
+    assert request.url.params["query"] == "Googleplex"
+    assert request.url.params["location"] == "37.4223878,-122.0841877"
+    assert request.url.params["radius"] == "5000"
+    assert request.url.params["type"] == "point_of_interest"
     
     # Verify the response
     assert isinstance(response, PlaceSearchResponse)
-    # The response should have results or not based on the mock
-    assert response.status in ["OK", "UNKNOWN_ERROR"]
+    assert response.status == "OK"
+    assert response.results[0].name == "Googleplex"
+    assert response.results[0].plus_code.global_code == "849VCWC8+W9"
+    assert response.results[0].photos[0].photo_reference == "test_photo_reference"
 
 
-@pytest.mark.asyncio
 async def test_get_place_details(
     google_places_client,
-    mock_httpx_client,
+    places_routes,
+    places_requests,
     mock_place_details_response
 ):
     """Test getting place details."""
-    # Create a mock response with the fixture data
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    
-    # Setup the async methods to be awaitable
-    async def mock_raise_for_status():
-        if 400 <= mock_response.status_code < 600:
-            raise httpx.HTTPStatusError("Error", request=None, response=mock_response)
-    
-    # Create a proper async function for json() that returns our fixture data
-    async def mock_json():
-        return mock_place_details_response
-    
-    # Set up the mock methods
-    mock_response.raise_for_status = mock_raise_for_status
-    mock_response.json = mock_json
-    
-    # Use AsyncMock for the request method so assertions work
-    mock_httpx_client.request = AsyncMock(return_value=mock_response)
+    places_routes["/details/json"] = mock_place_details_response
     
     # Call the method
     place = await google_places_client.get_place_details(
@@ -80,30 +60,35 @@ async def test_get_place_details(
     )
     
     # Verify the request was made correctly
-    mock_httpx_client.request.assert_awaited_once()
-    call_args = mock_httpx_client.request.await_args
+    assert len(places_requests) == 1
+    request = places_requests[0]
     
     # Check the request parameters
-    assert call_args.kwargs["method"] == "GET"
-    assert call_args.kwargs["url"] == "/details/json"
-    assert call_args.kwargs["params"]["place_id"] == "ChIJN1t_tDeuEmsRUsoyG83frY4"
-    assert call_args.kwargs["params"]["fields"] == "name,formatted_address,formatted_phone_number,website"
+    assert request.method == "GET"
+    assert request.url.path.endswith("/details/json")
+    assert request.url.params["place_id"] == "ChIJN1t_tDeuEmsRUsoyG83frY4"
+    assert request.url.params["fields"] == "name,formatted_address,formatted_phone_number,website"
     
     # Verify the response
     assert isinstance(place, Place)
     assert place.name == "Googleplex"
     assert place.formatted_address == "1600 Amphitheatre Pkwy, Mountain View, CA 94043, USA"
     assert place.formatted_phone_number == "(650) 253-0000"
+    assert place.price_level == "expensive"
     assert str(place.website) == "https://about.google/intl/en/locations/?region=north-america"
 
 
-@pytest.mark.asyncio
-async def test_find_place(google_places_client, mock_httpx_client):
+async def test_get_place_details_http_error(google_places_client, places_routes):
+    """Test that HTTP errors from the API are raised to the caller."""
+    places_routes["/details/json"] = lambda request: httpx.Response(500, json={"status": "UNKNOWN_ERROR"})
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await google_places_client.get_place_details(place_id="ChIJN1t_tDeuEmsRUsoyG83frY4")
+
+
+async def test_find_place(google_places_client, places_routes, places_requests):
     """Test finding a place by text input."""
-    # Setup mock response
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    places_routes["/findplacefromtext/json"] = {
         "candidates": [
             {
                 "place_id": "ChIJN1t_tDeuEmsRUsoyG83frY4",
@@ -120,8 +105,6 @@ async def test_find_place(google_places_client, mock_httpx_client):
         ],
         "status": "OK"
     }
-    mock_response.raise_for_status = AsyncMock()
-    mock_httpx_client.request.return_value = mock_response
     
     # Call the method
     places = await google_places_client.find_place(
@@ -131,30 +114,24 @@ async def test_find_place(google_places_client, mock_httpx_client):
     )
     
     # Verify the request was made correctly
-    mock_httpx_client.request.assert_awaited_once()
-    call_args = mock_httpx_client.request.await_args
+    assert len(places_requests) == 1
+    request = places_requests[0]
     
     # Check the request parameters
-    assert call_args.kwargs["method"] == "GET"
-    assert call_args.kwargs["url"] == "/findplacefromtext/json"
-    assert call_args.kwargs["params"]["input"] == "Googleplex"
-    assert call_args.kwargs["params"]["inputtype"] == "textquery"
-    assert call_args.kwargs["params"]["fields"] == "name,formatted_address"
+    assert request.method == "GET"
+    assert request.url.path.endswith("/findplacefromtext/json")
+    assert request.url.params["input"] == "Googleplex"
+    assert request.url.params["inputtype"] == "textquery"
+    assert request.url.params["fields"] == "name,formatted_address"
     
     # Verify the response
-    # The response should have results or not based on the mock
     assert isinstance(places, list)
+    assert [place.name for place in places] == ["Googleplex"]
 
 
-@pytest.mark.asyncio
-async def test_get_place_photo(google_places_client, mock_httpx_client, mock_photo_response):
+async def test_get_place_photo(google_places_client, places_routes, places_requests, mock_photo_response):
     """Test getting a place photo."""
-    # Setup mock response
-    mock_response = AsyncMock()
-    mock_response.status_code = 200
-    mock_response.raise_for_status = AsyncMock()
-    mock_response.aread = AsyncMock(return_value=mock_photo_response)
-    mock_httpx_client.request.return_value = mock_response
+    places_routes["/photo"] = mock_photo_response
     
     # Call the method
     photo_data = await google_places_client.get_place_photo(
@@ -163,14 +140,147 @@ async def test_get_place_photo(google_places_client, mock_httpx_client, mock_pho
     )
     
     # Verify the request was made correctly
-    mock_httpx_client.request.assert_awaited_once()
-    call_args = mock_httpx_client.request.await_args
+    assert len(places_requests) == 1
+    request = places_requests[0]
     
     # Check the request parameters
-    assert call_args.kwargs["method"] == "GET"
-    assert call_args.kwargs["url"] == "/photo"
-    assert call_args.kwargs["params"]["photoreference"] == "test_photo_reference"
-    assert call_args.kwargs["params"]["maxwidth"] == 400
+    assert request.method == "GET"
+    assert request.url.path.endswith("/photo")
+    assert request.url.params["photoreference"] == "test_photo_reference"
+    assert request.url.params["maxwidth"] == "400"
     
     # Verify the response
-    assert photo_data is not None
+    assert photo_data == mock_photo_response
+
+
+async def test_get_places_details_batch(google_places_client, places_routes, mock_place_details_response):
+    """Test fetching several place details concurrently with bounded concurrency."""
+    import asyncio
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def details(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        body = dict(mock_place_details_response)
+        body["result"] = {**body["result"], "place_id": request.url.params["place_id"]}
+        return httpx.Response(200, json=body)
+
+    places_routes["/details/json"] = details
+
+    places = await google_places_client.get_places_details_batch(
+        ["a", "b", "c", "d"], concurrency=2
+    )
+
+    assert [place.place_id for place in places] == ["a", "b", "c", "d"]
+    assert max_in_flight == 2
+
+
+def test_opening_hours_time_validation():
+    """Test that opening hours accept HHMM times and reject out-of-range values."""
+    from pydantic import ValidationError
+    from app.models.google_places_models import PlaceOpeningHoursPeriodDetail
+
+    for time in ("0000", "0930", "930", "2359"):
+        assert PlaceOpeningHoursPeriodDetail(day=1, time=time).time == time
+    for time in ("2400", "0960", "12", "12:30"):
+        with pytest.raises(ValidationError):
+            PlaceOpeningHoursPeriodDetail(day=1, time=time)
+
+
+def test_url_fields_are_plain_strings():
+    """Test that URL fields skip parsing but can be validated on demand."""
+    from pydantic import ValidationError
+    from app.models.google_places_models import validate_http_url
+
+    place = Place(
+        place_id="abc",
+        name="Pier",
+        formatted_address="1 Ocean Ave",
+        geometry={
+            "location": {"lat": 34.0, "lng": -118.5},
+            "viewport": {
+                "northeast": {"lat": 34.1, "lng": -118.4},
+                "southwest": {"lat": 33.9, "lng": -118.6},
+            },
+        },
+        website="https://example.com/pier",
+    )
+    assert place.website == "https://example.com/pier"
+    assert validate_http_url(place.website).host == "example.com"
+    with pytest.raises(ValidationError):
+        validate_http_url("not a url")
+
+
+async def test_search_places_accepts_location_tuple(
+    google_places_client,
+    places_routes,
+    places_requests,
+    mock_place_search_response
+):
+    """Test that a (lat, lng) tuple is formatted like the dict form."""
+    places_routes["/nearbysearch/json"] = mock_place_search_response
+
+    await google_places_client.search_places(location=(37.4223878, -122.0841877), radius=500)
+
+    assert places_requests[0].url.params["location"] == "37.4223878,-122.0841877"
+
+
+async def test_stream_place_photo(google_places_client, places_routes):
+    """Test streaming a photo into a sink without buffering it in the client."""
+    import io
+
+    def handler(request):
+        assert request.url.params["photoreference"] == "test_photo_reference"
+        assert request.url.params["maxwidth"] == "400"
+        return httpx.Response(200, content=b"x" * 200_000)
+
+    places_routes["/photo"] = handler
+    sink = io.BytesIO()
+
+    written = await google_places_client.stream_place_photo("test_photo_reference", sink, chunk_size=65536)
+
+    assert written == 200_000
+    assert sink.getvalue() == b"x" * 200_000
+
+
+@pytest.mark.parametrize("error_status", ["OVER_QUERY_LIMIT", "REQUEST_DENIED", "INVALID_REQUEST"])
+async def test_error_statuses_are_not_cached(
+    google_places_client,
+    places_routes,
+    places_requests,
+    mock_place_search_response,
+    error_status
+):
+    """Test that Places error envelopes are refetched while OK responses are cached."""
+    bodies = [{"status": error_status, "results": []}, mock_place_search_response]
+    places_routes["/textsearch/json"] = lambda request: httpx.Response(200, json=bodies.pop(0))
+
+    first = await google_places_client.search_places(query="beach")
+    second = await google_places_client.search_places(query="beach")
+    third = await google_places_client.search_places(query="beach")
+
+    assert first.status == error_status
+    assert second.status == third.status == "OK"
+    assert len(places_requests) == 2
+
+
+async def test_search_places_skips_invalid_photos(
+    google_places_client,
+    places_routes,
+    mock_place_search_response
+):
+    """Test that one malformed photo is dropped without discarding the search."""
+    response_data = copy.deepcopy(mock_place_search_response)
+    photos = response_data["results"][0]["photos"]
+    photos.append({"photo_reference": "missing_dimensions"})
+    places_routes["/textsearch/json"] = response_data
+
+    response = await google_places_client.search_places(query="Googleplex")
+
+    assert response.status == "OK"
+    assert [photo.photo_reference for photo in response.results[0].photos] == ["test_photo_reference"]
@@ -11,10 +11,20 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from app.main import app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI application."""
-    return TestClient(app)
+    """Create a test client for the FastAPI application, shared by all tests.
+    
+    Startup hooks run inside the block, so the LLM warmup is switched off.
+    """
+    from app.main import settings
+
+    warmup, settings.LLM_WARMUP = settings.LLM_WARMUP, False
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        settings.LLM_WARMUP = warmup
 
 
 def test_health_check(client):
@@ -26,3 +36,61 @@ def test_health_check(client):
     assert data["status"] == "healthy"
     assert "environment" in data
     assert "debug" in data
+
+
+def test_markdown_to_plain_text():
+    """Test that markdown emphasis, code and bullets are flattened."""
+    from app.main import markdown_to_plain_text
+
+    md = "**Tides:** high at `2 PM`\n* *calm* water\n  * parking\nplain"
+    assert markdown_to_plain_text(md) == "Tides: high at 2 PM\n- calm water\n- parking\nplain"
+
+
+@pytest.mark.parametrize("md, plain", [
+    ("**`code`**", "code"),
+    ("***both***", "both"),
+    ("**1. *Venice Beach***", "1. Venice Beach"),
+    ("* **Parking:** `$10`", "- Parking: $10"),
+])
+def test_markdown_to_plain_text_unwraps_nested_markup(md, plain):
+    """Test that nested bold, italics and code are fully stripped."""
+    from app.main import markdown_to_plain_text
+
+    assert markdown_to_plain_text(md) == plain
+
+
+def test_chat_stream_sends_server_sent_events(client, monkeypatch):
+    """Test that streamed chunks are framed as SSE events ending with [DONE]."""
+    from app import main
+
+    async def fake_stream(message):
+        yield "High tide "
+        yield "at 2 PM.\nStay safe!"
+
+    monkeypatch.setattr(main.beach_agent, "stream_message", fake_stream)
+    response = client.post("/api/v1/chat/stream", json={"message": "Tides?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        'data: "High tide "\n\n'
+        'data: "at 2 PM.\\nStay safe!"\n\n'
+        "data: [DONE]\n\n"
+    )
+
+
+async def test_shutdown_cancels_pending_warmup(monkeypatch):
+    """Test that shutdown cancels a warmup that is still waiting on the LLM."""
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+    from app import main
+
+    warmup = asyncio.create_task(asyncio.sleep(60))
+    monkeypatch.setattr(main, "_warmup_task", warmup)
+    monkeypatch.setattr(main, "chat_batcher", None)
+    monkeypatch.setattr(main, "http_transport", MagicMock(aclose=AsyncMock()))
+
+    await main.shutdown()
+
+    assert warmup.cancelled()
+    main.http_transport.aclose.assert_awaited_once()
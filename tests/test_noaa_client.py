@@ -1,4 +1,5 @@
 """Tests for the NOAA API client."""
+import copy
 import pytest
 import json
 from datetime import datetime, timedelta
@@ -15,57 +16,66 @@ from app.models.noaa_models import (
 )
 
 
-@pytest.fixture
+# Payloads below back module-scoped fixtures, so tests must copy them before mutating
+_MOCK_TIDE_PREDICTIONS_RESPONSE = {
+    "predictions": [
+        {"t": "2023-01-01 01:23", "v": "5.2", "type": "H"},
+        {"t": "2023-01-01 07:45", "v": "0.8", "type": "L"},
+        {"t": "2023-01-01 14:12", "v": "5.8", "type": "H"},
+        {"t": "2023-01-01 20:30", "v": "1.2", "type": "L"},
+    ]
+}
+
+
+_MOCK_WATER_TEMP_RESPONSE = {
+    "data": [
+        {"t": "2023-01-01 00:00", "v": "12.3"},
+        {"t": "2023-01-01 01:00", "v": "12.4"},
+        {"t": "2023-01-01 02:00", "v": "12.5"},
+    ]
+}
+
+
+_MOCK_STATIONS_RESPONSE = {
+    "stations": [
+        {
+            "id": "9414290",
+            "name": "San Francisco, CA",
+            "lat": 37.8067,
+            "lng": -122.4653,
+            "state": "CA",
+            "distance": 1.5
+        },
+        {
+            "id": "9414750",
+            "name": "Alameda, CA",
+            "lat": 37.7717,
+            "lng": -122.3000,
+            "state": "CA",
+            "distance": 10.2
+        }
+    ]
+}
+
+
+@pytest.fixture(scope="module")
 def mock_tide_predictions_response():
     """Mock response for tide predictions."""
-    return {
-        "predictions": [
-            {"t": "2023-01-01 01:23", "v": "5.2", "type": "H"},
-            {"t": "2023-01-01 07:45", "v": "0.8", "type": "L"},
-            {"t": "2023-01-01 14:12", "v": "5.8", "type": "H"},
-            {"t": "2023-01-01 20:30", "v": "1.2", "type": "L"},
-        ]
-    }
+    return _MOCK_TIDE_PREDICTIONS_RESPONSE
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_water_temp_response():
     """Mock response for water temperature."""
-    return {
-        "data": [
-            {"t": "2023-01-01 00:00", "v": "12.3"},
-            {"t": "2023-01-01 01:00", "v": "12.4"},
-            {"t": "2023-01-01 02:00", "v": "12.5"},
-        ]
-    }
+    return _MOCK_WATER_TEMP_RESPONSE
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_stations_response():
     """Mock response for stations."""
-    return {
-        "stations": [
-            {
-                "id": "9414290",
-                "name": "San Francisco, CA",
-                "lat": 37.8067,
-                "lng": -122.4653,
-                "state": "CA",
-                "distance": 1.5
-            },
-            {
-                "id": "9414750",
-                "name": "Alameda, CA",
-                "lat": 37.7717,
-                "lng": -122.3000,
-                "state": "CA",
-                "distance": 10.2
-            }
-        ]
-    }
+    return _MOCK_STATIONS_RESPONSE
 
 
-@pytest.mark.asyncio
 async def test_get_tide_predictions(noaa_client, mock_httpx_client, mock_tide_predictions_response):
     """Test getting tide predictions from NOAA API."""
     # Setup mock response with request object
@@ -111,7 +121,6 @@ async def test_get_tide_predictions(noaa_client, mock_httpx_client, mock_tide_pr
     assert predictions[0].type == "H"
 
 
-@pytest.mark.asyncio
 async def test_find_stations(noaa_client, mock_httpx_client, mock_stations_response):
     """Test finding stations near a location."""
     # Setup mock response with request object
@@ -162,7 +171,6 @@ async def test_find_stations(noaa_client, mock_httpx_client, mock_stations_respo
     assert stations[1].distance == 10.2
 
 
-@pytest.mark.asyncio
 async def test_get_water_temperature(noaa_client, mock_httpx_client, mock_water_temp_response):
     """Test getting water temperature data."""
     # Setup mock response with request object
@@ -204,3 +212,86 @@ async def test_get_water_temperature(noaa_client, mock_httpx_client, mock_water_
     assert isinstance(temps[0], NoaaWaterTemperatureData)
     assert temps[0].t == "2023-01-01 00:00"
     assert temps[0].v == "12.3"
+
+
+def test_date_range_defaults():
+    """Test resolving NOAA begin/end dates from the various date arguments."""
+    from app.services.noaa_client import _date_range
+    now = datetime(2024, 2, 29, 13, 5)
+
+    assert _date_range(now, "20240101", None, default_begin=now) == ("20240229", "20240229")
+    assert _date_range(None, None, None, default_begin=now) == ("20240229", "20240301")
+    assert _date_range(None, "20231231", None, default_begin=now) == ("20231231", "20240101")
+    assert _date_range(
+        None, None, None, default_begin=now - timedelta(days=1), default_end=now
+    ) == ("20240228", "20240229")
+
+
+async def test_close_leaves_injected_client_open(noaa_client, mock_httpx_client):
+    """Test that closing the NOAA client doesn't close a client owned by the caller."""
+    await noaa_client.close()
+    mock_httpx_client.aclose.assert_not_awaited()
+
+
+async def test_repeated_requests_are_cached(noaa_client, mock_httpx_client, mock_tide_predictions_response):
+    """Test that identical GET requests reuse the cached response."""
+    mock_request = httpx.Request("GET", "https://api.tidesandcurrents.noaa.gov/api/prod/")
+    mock_httpx_client.request.return_value = httpx.Response(
+        200,
+        json=mock_tide_predictions_response,
+        request=mock_request
+    )
+
+    first = await noaa_client.get_tide_predictions(station_id="9414290", date="20230101")
+    second = await noaa_client.get_tide_predictions(station_id="9414290", date="20230101")
+    await noaa_client.get_tide_predictions(station_id="9414290", date="20230102")
+
+    assert first == second
+    assert mock_httpx_client.request.await_count == 2
+
+
+async def test_empty_predictions_are_not_cached(noaa_client, mock_httpx_client):
+    """Test that a response without predictions is refetched on the next request."""
+    mock_request = httpx.Request("GET", "https://api.tidesandcurrents.noaa.gov/api/prod/")
+    mock_httpx_client.request.return_value = httpx.Response(
+        200,
+        json={"predictions": []},
+        request=mock_request
+    )
+
+    assert await noaa_client.get_tide_predictions(station_id="9414290", date="20230103") == []
+    assert await noaa_client.get_tide_predictions(station_id="9414290", date="20230103") == []
+    assert mock_httpx_client.request.await_count == 2
+
+
+async def test_find_stations_skips_invalid_rows(noaa_client, mock_httpx_client, mock_stations_response):
+    """Test that one malformed station doesn't discard the valid ones."""
+    stations_response = copy.deepcopy(mock_stations_response)
+    stations_response["stations"].append({"id": "bad", "name": "Missing coordinates"})
+    mock_request = httpx.Request("GET", "https://api.tidesandcurrents.noaa.gov/api/prod/")
+    mock_httpx_client.request.return_value = httpx.Response(
+        200,
+        json=stations_response,
+        request=mock_request
+    )
+
+    stations = await noaa_client.find_stations(lat=37.7749, lng=-122.4194)
+
+    assert [station.id for station in stations] == ["9414290", "9414750"]
+
+
+async def test_find_stations_raw(noaa_client, mock_httpx_client, mock_stations_response):
+    """Test finding stations as plain tuples."""
+    mock_request = httpx.Request("GET", "https://api.tidesandcurrents.noaa.gov/api/prod/")
+    mock_httpx_client.request.return_value = httpx.Response(
+        200,
+        json=mock_stations_response,
+        request=mock_request
+    )
+
+    stations = await noaa_client.find_stations_raw(lat=37.7749, lng=-122.4194)
+
+    assert stations == [
+        ("9414290", "San Francisco, CA", 37.8067, -122.4653, 1.5),
+        ("9414750", "Alameda, CA", 37.7717, -122.3, 10.2),
+    ]
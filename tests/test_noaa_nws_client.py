@@ -1,65 +1,259 @@
 """Unit tests for the NOAA National Weather Service (NWS) client."""
+import httpx
+import orjson
 import pytest
-from unittest.mock import AsyncMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 from app.services.noaa_nws_client import NoaaNwsClient
 
-@pytest.mark.asyncio
-async def test_get_forecast_success():
-    client = NoaaNwsClient()
-    lat, lon = 26.2379, -80.1248
-    # Patch httpx.AsyncClient.get to mock NWS API responses
-    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
-        # Mock /points/{lat,lon} response
-        from unittest.mock import MagicMock
-        mock_resp1 = MagicMock(status_code=200)
-        mock_resp1.json.return_value = {"properties": {"forecast": "https://api.weather.gov/gridpoints/MFL/110,71/forecast"}}
-        mock_resp1.raise_for_status = MagicMock()
-        mock_resp2 = MagicMock(status_code=200)
-        mock_resp2.json.return_value = {"properties": {"periods": [{"name": "Today", "detailedForecast": "Sunny, high near 80."}]}}
-        mock_resp2.raise_for_status = MagicMock()
-        mock_get.side_effect = [mock_resp1, mock_resp2]
-        result = await client.get_forecast(lat, lon)
-        assert result is not None
-        assert "properties" in result
-        assert "periods" in result["properties"]
-        assert result["properties"]["periods"][0]["name"] == "Today"
-
-@pytest.mark.asyncio
-async def test_get_current_conditions_success():
-    client = NoaaNwsClient()
-    lat, lon = 26.2379, -80.1248
-    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
-        from unittest.mock import MagicMock
-        mock_resp1 = MagicMock(status_code=200)
-        mock_resp1.json.return_value = {"properties": {"observationStations": "https://api.weather.gov/gridpoints/MFL/110,71/stations"}}
-        mock_resp1.raise_for_status = MagicMock()
-        mock_resp2 = MagicMock(status_code=200)
-        mock_resp2.json.return_value = {"features": [{"properties": {"stationIdentifier": "KPMP"}}]}
-        mock_resp2.raise_for_status = MagicMock()
-        mock_resp3 = MagicMock(status_code=200)
-        mock_resp3.json.return_value = {"properties": {"temperature": {"value": 25.0, "unitCode": "unit:degC"}, "textDescription": "Clear"}}
-        mock_resp3.raise_for_status = MagicMock()
-        mock_get.side_effect = [mock_resp1, mock_resp2, mock_resp3]
-        result = await client.get_current_conditions(lat, lon)
-        assert result is not None
-        assert "properties" in result
-        assert result["properties"]["textDescription"] == "Clear"
-        assert result["properties"]["temperature"]["value"] == 25.0
-
-@pytest.mark.asyncio
-async def test_get_forecast_error():
-    client = NoaaNwsClient()
-    lat, lon = 0.0, 0.0
-    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
-        mock_get.side_effect = Exception("Network error")
-        result = await client.get_forecast(lat, lon)
-        assert result is None
-
-@pytest.mark.asyncio
-async def test_get_current_conditions_error():
-    client = NoaaNwsClient()
-    lat, lon = 0.0, 0.0
-    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
-        mock_get.side_effect = Exception("Network error")
-        result = await client.get_current_conditions(lat, lon)
-        assert result is None
+POMPANO = (26.2379, -80.1248)
+NULL_ISLAND = (0.0, 0.0)
+FORECAST_URL = "https://api.weather.gov/gridpoints/MFL/110,71/forecast"
+STATIONS_URL = "https://api.weather.gov/gridpoints/MFL/110,71/stations"
+POINTS_RESP = {"properties": {"forecast": FORECAST_URL, "observationStations": STATIONS_URL}}
+FORECAST_RESP = {"properties": {"periods": [{"name": "Today", "detailedForecast": "Sunny, high near 80."}]}}
+STATIONS_RESP = {"features": [{"properties": {"stationIdentifier": "KPMP"}}]}
+NO_STATIONS_RESP = {"features": []}
+OBS_RESP = {"properties": {"temperature": {"value": 25.0, "unitCode": "unit:degC"}, "textDescription": "Clear"}}
+# Encoded once; handlers serve the bytes as-is
+ROUTES = {
+    "/points/26.2379,-80.1248": orjson.dumps(POINTS_RESP),
+    "/gridpoints/MFL/110,71/forecast": orjson.dumps(FORECAST_RESP),
+    "/gridpoints/MFL/110,71/stations": orjson.dumps(STATIONS_RESP),
+    "/stations/KPMP/observations/latest": orjson.dumps(OBS_RESP),
+}
+NO_STATIONS_ROUTES = {**ROUTES, "/gridpoints/MFL/110,71/stations": orjson.dumps(NO_STATIONS_RESP)}
+
+def _recording(routes, requests):
+    """Wrap encoded route bodies in handlers that log each request."""
+    def handler(body):
+        def respond(request):
+            requests.append(request)
+            return httpx.Response(200, content=body)
+        return respond
+    return {path: handler(body) for path, body in routes.items()}
+
+def _response(payload, status_code=200):
+    """Minimal stand-in for an httpx.Response returned by a mocked client."""
+    return SimpleNamespace(
+        status_code=status_code, content=orjson.dumps(payload), raise_for_status=lambda: None
+    )
+
+@pytest.mark.parametrize("method, expected", [
+    ("get_forecast", FORECAST_RESP),
+    ("get_current_conditions", OBS_RESP),
+])
+async def test_get_success(nws_client, nws_routes, method, expected):
+    nws_routes.update(ROUTES)
+    result = await getattr(nws_client, method)(*POMPANO)
+    assert result == expected
+
+async def test_repeat_forecast_is_served_from_cache(nws_client, nws_routes):
+    requests = []
+    nws_routes.update(_recording(ROUTES, requests))
+    assert await nws_client.get_forecast(*POMPANO) == FORECAST_RESP
+    assert await nws_client.get_forecast(*POMPANO) == FORECAST_RESP
+    assert [request.url.path for request in requests] == ["/points/26.2379,-80.1248", "/gridpoints/MFL/110,71/forecast"]
+
+@pytest.mark.parametrize("error", [httpx.ConnectError("Network error"), httpx.ReadTimeout("Timed out")])
+@pytest.mark.parametrize("method", ["get_forecast", "get_current_conditions"])
+async def test_get_error(nws_client, nws_routes, method, error):
+    def fail(request):
+        raise error
+
+    nws_routes["/points/0.0,0.0"] = fail
+    result = await getattr(nws_client, method)(*NULL_ISLAND)
+    assert result is None
+
+async def test_failed_points_lookup_is_not_retried_immediately(nws_client, nws_routes, monkeypatch):
+    attempts = []
+
+    def fail(request):
+        attempts.append(request.url.path)
+        raise httpx.ConnectError("Network error")
+
+    nws_routes["/points/0.0,0.0"] = fail
+    assert await nws_client.get_forecast(*NULL_ISLAND) is None
+    assert await nws_client.get_current_conditions(*NULL_ISLAND) is None
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(NoaaNwsClient, "POINTS_FAILURE_TTL", 0)
+    nws_client.clear_cache()
+    assert await nws_client.get_forecast(*NULL_ISLAND) is None
+    assert await nws_client.get_forecast(*NULL_ISLAND) is None
+    assert len(attempts) == 3
+
+async def test_unexpected_errors_propagate(nws_client, nws_routes):
+    def fail(request):
+        raise RuntimeError("bug")
+
+    nws_routes["/points/0.0,0.0"] = fail
+    with pytest.raises(RuntimeError):
+        await nws_client.get_forecast(*NULL_ISLAND)
+
+async def test_requests_send_nws_headers(nws_client, nws_routes):
+    seen = []
+
+    def points(request):
+        seen.append(request.headers)
+        return httpx.Response(404)
+
+    nws_routes["/points/26.2379,-80.1248"] = points
+    assert await nws_client.get_forecast(*POMPANO) is None
+    assert seen[0]["User-Agent"] == nws_client.user_agent
+    assert seen[0]["Accept"] == "application/geo+json,application/json"
+
+async def test_uses_injected_client():
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(side_effect=httpx.ConnectError("Network error"))
+    client = NoaaNwsClient(client=mock_client)
+    assert await client.get_forecast(*NULL_ISLAND) is None
+    assert await client.get_current_conditions(1.0, 1.0) is None
+    assert mock_client.get.await_count == 2
+
+async def test_context_manager_closes_owned_client():
+    async with NoaaNwsClient() as client:
+        http_client = client._client
+        assert not http_client.is_closed
+    assert http_client.is_closed
+
+async def test_close_leaves_shared_transport_open():
+    class TrackingTransport(httpx.MockTransport):
+        closed = False
+
+        async def aclose(self):
+            self.closed = True
+
+    transport = TrackingTransport(lambda request: httpx.Response(200, content=ROUTES[request.url.path]))
+    first = NoaaNwsClient(transport=transport)
+    sibling = NoaaNwsClient(transport=transport)
+    await first.close()
+    assert not transport.closed
+    assert await sibling.get_forecast(*POMPANO) == FORECAST_RESP
+    await sibling.close()
+    assert not transport.closed
+
+async def test_points_lookup_is_shared_between_calls(nws_client, nws_routes):
+    requests = []
+    nws_routes.update(_recording(NO_STATIONS_ROUTES, requests))
+
+    assert await nws_client.get_forecast(26.23791, -80.12481) == FORECAST_RESP
+    assert await nws_client.get_current_conditions(26.23789, -80.12479) is None
+    assert [request.url.path for request in requests] == [
+        "/points/26.2379,-80.1248",
+        "/gridpoints/MFL/110,71/forecast",
+        "/gridpoints/MFL/110,71/stations",
+    ]
+
+async def test_get_all_fetches_forecast_and_conditions(nws_client, nws_routes):
+    requests = []
+    nws_routes.update(_recording(ROUTES, requests))
+
+    forecast, conditions = await nws_client.get_all(*POMPANO)
+    assert forecast == FORECAST_RESP
+    assert conditions == OBS_RESP
+    assert sorted(request.url.path for request in requests) == sorted(ROUTES)
+
+async def test_forecast_is_cached_per_grid_point(nws_client, nws_routes):
+    requests = []
+    nws_routes.update(_recording(NO_STATIONS_ROUTES, requests))
+
+    first = await nws_client.get_forecast(*POMPANO)
+    second, conditions = await nws_client.get_all(*POMPANO)
+    assert first == second == FORECAST_RESP
+    assert conditions is None
+    assert len(requests) == 3
+
+async def test_failed_forecast_is_not_cached(nws_client, nws_routes):
+    failures = [httpx.ConnectError("Network error")]
+
+    def forecast(request):
+        if failures:
+            raise failures.pop()
+        return httpx.Response(200, json=FORECAST_RESP)
+
+    nws_routes.update(ROUTES)
+    nws_routes["/gridpoints/MFL/110,71/forecast"] = forecast
+
+    assert await nws_client.get_forecast(*POMPANO) is None
+    assert await nws_client.get_forecast(*POMPANO) == FORECAST_RESP
+
+async def test_headers_are_client_defaults():
+    async with NoaaNwsClient(user_agent="beach-ai-test") as client:
+        assert client._client.headers["User-Agent"] == "beach-ai-test"
+        assert client._request_headers is None
+
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(side_effect=httpx.ConnectError("Network error"))
+    client = NoaaNwsClient(user_agent="beach-ai-test", client=mock_client)
+    await client.get_forecast(*NULL_ISLAND)
+    assert mock_client.get.await_args.kwargs["headers"]["User-Agent"] == "beach-ai-test"
+
+async def test_get_forecasts_bulk_keeps_order():
+    async def get_forecast(lat, lon):
+        return None if lat == 0.0 else {"lat": lat}
+
+    async with NoaaNwsClient() as client:
+        client.get_forecast = get_forecast
+        results = await client.get_forecasts_bulk([(26.1, -80.1), NULL_ISLAND, (26.3, -80.1)], concurrency=2)
+    assert results == [{"lat": 26.1}, None, {"lat": 26.3}]
+
+async def test_get_forecast_summary_projects_fields():
+    async def get_forecast(lat, lon):
+        return {"properties": {"periods": [{
+            "name": "Today", "temperature": 80, "temperatureUnit": "F",
+            "shortForecast": "Sunny", "windSpeed": "10 mph", "windDirection": "E",
+            "detailedForecast": "Sunny, with a high near 80.", "icon": "https://example.com/icon",
+        }]}}
+
+    async with NoaaNwsClient() as client:
+        client.get_forecast = get_forecast
+        summary = await client.get_forecast_summary(*POMPANO)
+        assert summary == {"periods": [{
+            "name": "Today", "temperature": 80, "temperatureUnit": "F",
+            "shortForecast": "Sunny", "windSpeed": "10 mph", "windDirection": "E",
+        }]}
+        summary = await client.get_forecast_summary(*POMPANO, fields=("detailedForecast",))
+        assert summary == {"periods": [{"detailedForecast": "Sunny, with a high near 80."}]}
+
+async def test_station_is_cached_after_observations_expire(nws_client, nws_routes):
+    requests = []
+    nws_routes.update(_recording(ROUTES, requests))
+
+    assert await nws_client.get_current_conditions(*POMPANO) == OBS_RESP
+    nws_client._obs_cache.clear()
+    assert await nws_client.get_current_conditions(*POMPANO) == OBS_RESP
+
+    assert requests[1].url.params["limit"] == "1"
+    assert [request.url.path for request in requests[2:]] == [
+        "/stations/KPMP/observations/latest",
+    ] * 2
+
+async def test_server_errors_are_retried(monkeypatch):
+
+    statuses = [503, 503, 200, 503, 503, 503]
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.url.path)
+        return httpx.Response(statuses.pop(0), json=FORECAST_RESP)
+
+    monkeypatch.setattr(NoaaNwsClient, "RETRY_BACKOFF", 0)
+    async with NoaaNwsClient(transport=httpx.MockTransport(handler)) as client:
+        assert await client._fetch_forecast(FORECAST_URL) == FORECAST_RESP
+        assert len(attempts) == 3
+        # Gives up after MAX_RETRIES retries
+        assert await client._fetch_forecast(FORECAST_URL) is None
+        assert len(attempts) == 6
+
+async def test_clear_cache_forgets_points():
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_response(POINTS_RESP))
+    client = NoaaNwsClient(client=mock_client)
+
+    await client._get_points(*POMPANO)
+    await client._get_points(*POMPANO)
+    assert mock_client.get.await_count == 1
+    client.clear_cache()
+    await client._get_points(*POMPANO)
+    assert mock_client.get.await_count == 2
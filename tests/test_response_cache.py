@@ -0,0 +1,67 @@
+"""Tests for the LLM response cache."""
+from app.utils.response_cache import ResponseCache
+
+
+PREFIX = [{"role": "system", "content": "You are BeachBot."}]
+
+
+def _conversation(question: str):
+    return [*PREFIX, {"role": "user", "content": question}]
+
+
+async def test_exact_match_ignores_case_and_punctuation():
+    """Test that normalized identical questions hit the cache."""
+    cache = ResponseCache()
+    await cache.set(_conversation("What's the tide at Venice Beach?"), "High tide at 2 PM.")
+
+    assert await cache.get(_conversation("what's the tide at venice beach")) == "High tide at 2 PM."
+    assert await cache.get(_conversation("What's the tide at Miami Beach?")) is None
+
+
+async def test_different_prefix_misses():
+    """Test that answers are only reused for the same conversation state."""
+    cache = ResponseCache()
+    await cache.set(_conversation("Is it sunny?"), "Yes.")
+
+    other = [{"role": "system", "content": "Other prompt."}, {"role": "user", "content": "Is it sunny?"}]
+    assert await cache.get(other) is None
+
+
+async def test_repeated_question_replaces_earlier_answer():
+    """Test that storing the same question again keeps a single, updated entry."""
+    cache = ResponseCache()
+    await cache.set(_conversation("Is it sunny?"), "Yes.")
+    await cache.set(_conversation("is it sunny"), "Cloudy now.")
+
+    assert await cache.get(_conversation("Is it sunny?")) == "Cloudy now."
+    assert len(cache._entries[ResponseCache.prefix_key(PREFIX)]) == 1
+
+
+async def test_semantic_match_uses_embedder():
+    """Test that similar embeddings above the threshold hit the cache."""
+    vectors = {
+        "weather at venice beach": [1.0, 0.0],
+        "venice beach weather": [0.99, 0.05],
+        "parking at venice beach": [0.0, 1.0],
+    }
+
+    async def embed(text):
+        return vectors[text]
+
+    cache = ResponseCache(similarity_threshold=0.95, embedder=embed)
+    await cache.set(_conversation("Weather at Venice Beach"), "Sunny.")
+
+    assert await cache.get(_conversation("Venice Beach weather")) == "Sunny."
+    assert await cache.get(_conversation("Parking at Venice Beach")) is None
+
+
+async def test_evicts_least_recently_used_prefix():
+    """Test that the cache is bounded by number of prefixes."""
+    cache = ResponseCache(max_entries=1)
+    first = [{"role": "system", "content": "a"}, {"role": "user", "content": "q"}]
+    second = [{"role": "system", "content": "b"}, {"role": "user", "content": "q"}]
+    await cache.set(first, "one")
+    await cache.set(second, "two")
+
+    assert await cache.get(first) is None
+    assert await cache.get(second) == "two"